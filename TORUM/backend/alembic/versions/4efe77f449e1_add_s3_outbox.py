@@ -0,0 +1,39 @@
+"""Add S3 outbox
+
+Revision ID: 4efe77f449e1
+Revises: 77c3d3c3982a
+Create Date: 2026-10-18 16:48:30.771265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4efe77f449e1'
+down_revision: Union[str, Sequence[str], None] = '77c3d3c3982a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        's3_outbox',
+        sa.Column('outbox_id', sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column('s3_key', sa.String(), nullable=False),
+        sa.Column('reason', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('available_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_error', sa.Text()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index(op.f('ix_s3_outbox_available_at'), 's3_outbox', ['available_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_s3_outbox_available_at'), table_name='s3_outbox')
+    op.drop_table('s3_outbox')
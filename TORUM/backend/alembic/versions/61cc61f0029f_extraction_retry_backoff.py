@@ -0,0 +1,37 @@
+"""Extraction retry backoff
+
+Revision ID: 61cc61f0029f
+Revises: 72da1513d0ba
+Create Date: 2026-10-18 23:41:06.215873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '61cc61f0029f'
+down_revision: Union[str, Sequence[str], None] = '72da1513d0ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reading_documents', sa.Column('extraction_attempts', sa.Integer(), nullable=False, server_default='0'))
+    # Pending rows are claimed in due order now, not upload order.
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_docs_extraction_pending', table_name='reading_documents', postgresql_concurrently=True)
+        op.create_index('idx_docs_extraction_pending', 'reading_documents', ['extraction_updated_at'],
+                        postgresql_where=sa.text("extraction_status = 'pending'"), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_docs_extraction_pending', table_name='reading_documents', postgresql_concurrently=True)
+        op.create_index('idx_docs_extraction_pending', 'reading_documents', ['uploaded_at'],
+                        postgresql_where=sa.text("extraction_status = 'pending'"), postgresql_concurrently=True)
+    op.drop_column('reading_documents', 'extraction_attempts')
@@ -0,0 +1,29 @@
+"""Add posts feed index
+
+Revision ID: 72da1513d0ba
+Revises: 1f0d55dce3e2
+Create Date: 2026-10-18 22:03:17.481925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '72da1513d0ba'
+down_revision: Union[str, Sequence[str], None] = '1f0d55dce3e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_posts_created', 'posts',
+                    [sa.text('created_at DESC'), sa.text('post_id DESC')])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_posts_created', table_name='posts')
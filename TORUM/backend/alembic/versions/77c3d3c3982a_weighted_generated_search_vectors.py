@@ -0,0 +1,93 @@
+"""Weighted generated search vectors
+
+Revision ID: 77c3d3c3982a
+Revises: c3b5db943e9b
+Create Date: 2026-10-18 16:05:12.418093
+
+Replaces the tsvector_update_trigger triggers with STORED generated columns.
+Postgres only recomputes them when one of their source columns changes, and
+the title is weighted above the body for ts_rank_cd.
+
+Reindex plan: adding a stored generated column rewrites the table under an
+ACCESS EXCLUSIVE lock, so run this in a maintenance window on large tables.
+The GIN indexes are built afterwards with CREATE INDEX CONCURRENTLY, which lets
+reads and writes continue while they build.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '77c3d3c3982a'
+down_revision: Union[str, Sequence[str], None] = 'c3b5db943e9b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+POSTS_SEARCH_VECTOR = (
+    "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(post_title, '')), 'A') || "
+    "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(post_content, '')), 'B')"
+)
+DOCS_SEARCH_VECTOR = (
+    "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(docs_title, '')), 'A') || "
+    "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(docs_description, '')), 'B') || "
+    "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(docs_tags, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS tsvector_update_posts ON posts")
+    op.execute("DROP TRIGGER IF EXISTS tsvector_update_docs ON reading_documents")
+    op.drop_index('idx_post_search', table_name='posts')
+    op.drop_index('idx_docs_search', table_name='reading_documents')
+    op.drop_column('posts', 'search_vector')
+    op.drop_column('reading_documents', 'search_vector')
+
+    op.add_column('posts', sa.Column('search_vector', sa.dialects.postgresql.TSVECTOR,
+                                     sa.Computed(POSTS_SEARCH_VECTOR, persisted=True)))
+    op.add_column('reading_documents', sa.Column('search_vector', sa.dialects.postgresql.TSVECTOR,
+                                                 sa.Computed(DOCS_SEARCH_VECTOR, persisted=True)))
+
+    with op.get_context().autocommit_block():
+        op.create_index('idx_post_search', 'posts', ['search_vector'],
+                        postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('idx_docs_search', 'reading_documents', ['search_vector'],
+                        postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_post_search', table_name='posts')
+    op.drop_index('idx_docs_search', table_name='reading_documents')
+    op.drop_column('posts', 'search_vector')
+    op.drop_column('reading_documents', 'search_vector')
+
+    op.add_column('posts', sa.Column('search_vector', sa.dialects.postgresql.TSVECTOR))
+    op.add_column('reading_documents', sa.Column('search_vector', sa.dialects.postgresql.TSVECTOR))
+    op.execute("""
+        UPDATE posts
+        SET search_vector = to_tsvector('english', post_title || ' ' || coalesce(post_content, ''))
+    """)
+    op.execute("""
+        UPDATE reading_documents
+        SET search_vector = to_tsvector('english', docs_title || ' ' || coalesce(docs_description, '') || ' ' || docs_tags)
+    """)
+    op.create_index('idx_post_search', 'posts', ['search_vector'], postgresql_using='gin')
+    op.create_index('idx_docs_search', 'reading_documents', ['search_vector'], postgresql_using='gin')
+    op.execute("""
+        CREATE TRIGGER tsvector_update_posts
+        BEFORE INSERT OR UPDATE ON posts
+        FOR EACH ROW
+        EXECUTE FUNCTION
+        tsvector_update_trigger(search_vector, 'pg_catalog.english', post_title, post_content)
+    """)
+    op.execute("""
+        CREATE TRIGGER tsvector_update_docs
+        BEFORE INSERT OR UPDATE ON reading_documents
+        FOR EACH ROW
+        EXECUTE FUNCTION
+        tsvector_update_trigger(search_vector, 'pg_catalog.english', docs_title, docs_description, docs_tags)
+    """)
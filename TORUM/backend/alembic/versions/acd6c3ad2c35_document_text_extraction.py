@@ -0,0 +1,65 @@
+"""Document text extraction
+
+Revision ID: acd6c3ad2c35
+Revises: 4efe77f449e1
+Create Date: 2026-10-18 19:42:37.206514
+
+Adds the extraction bookkeeping columns and body_vector to reading_documents,
+then folds body_vector into the generated search_vector. A generated
+column's expression can't be altered in place, so the column is dropped and
+added again; that rewrites the table, as in 77c3d3c3982a. Existing documents
+start as "pending". Run `python -m backend.src.auth.extraction --backfill` to
+index them without waiting on the API's workers.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'acd6c3ad2c35'
+down_revision: Union[str, Sequence[str], None] = '4efe77f449e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DOCS_SEARCH_VECTOR = (
+    "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(docs_title, '')), 'A') || "
+    "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(docs_description, '')), 'B') || "
+    "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(docs_tags, '')), 'C')"
+)
+DOCS_SEARCH_VECTOR_WITH_BODY = DOCS_SEARCH_VECTOR + " || coalesce(body_vector, ''::tsvector)"
+
+
+def _replace_search_vector(expression: str) -> None:
+    op.drop_index('idx_docs_search', table_name='reading_documents')
+    op.drop_column('reading_documents', 'search_vector')
+    op.add_column('reading_documents', sa.Column('search_vector', sa.dialects.postgresql.TSVECTOR,
+                                                 sa.Computed(expression, persisted=True)))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reading_documents', sa.Column('extraction_status', sa.String(), nullable=False, server_default='pending'))
+    op.add_column('reading_documents', sa.Column('extraction_error', sa.Text(), nullable=True))
+    op.add_column('reading_documents', sa.Column('extraction_updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()))
+    op.add_column('reading_documents', sa.Column('body_vector', sa.dialects.postgresql.TSVECTOR, nullable=True))
+    _replace_search_vector(DOCS_SEARCH_VECTOR_WITH_BODY)
+
+    with op.get_context().autocommit_block():
+        op.create_index('idx_docs_search', 'reading_documents', ['search_vector'],
+                        postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('idx_docs_extraction_pending', 'reading_documents', ['uploaded_at'],
+                        postgresql_where=sa.text("extraction_status = 'pending'"), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_docs_extraction_pending', table_name='reading_documents')
+    _replace_search_vector(DOCS_SEARCH_VECTOR)
+    op.drop_column('reading_documents', 'body_vector')
+    op.drop_column('reading_documents', 'extraction_updated_at')
+    op.drop_column('reading_documents', 'extraction_error')
+    op.drop_column('reading_documents', 'extraction_status')
+    op.create_index('idx_docs_search', 'reading_documents', ['search_vector'], postgresql_using='gin')
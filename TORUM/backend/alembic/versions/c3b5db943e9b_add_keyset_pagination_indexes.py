@@ -0,0 +1,32 @@
+"""Add keyset pagination indexes
+
+Revision ID: c3b5db943e9b
+Revises: 86f68104fe8a
+Create Date: 2026-10-18 09:12:41.207534
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3b5db943e9b'
+down_revision: Union[str, Sequence[str], None] = '86f68104fe8a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_posts_owner_created', 'posts',
+                    ['post_owner', sa.text('created_at DESC'), sa.text('post_id DESC')])
+    op.create_index('idx_docs_owner_uploaded', 'reading_documents',
+                    ['docs_owner', sa.text('uploaded_at DESC'), sa.text('docs_id DESC')])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_docs_owner_uploaded', table_name='reading_documents')
+    op.drop_index('idx_posts_owner_created', table_name='posts')
@@ -0,0 +1,69 @@
+import asyncio
+
+from fastapi.responses import JSONResponse
+
+from backend.src.config import get_settings
+from backend.src.metrics import admission_queued, admission_shed
+
+settings = get_settings()
+
+class AdmissionMiddleware:
+    """Bounds the requests a worker handles at once.
+
+    Up to ADMISSION_MAX_IN_FLIGHT requests run concurrently. Later ones wait in
+    FIFO order for a slot. Once ADMISSION_MAX_QUEUED are already waiting, or a
+    request has waited ADMISSION_QUEUE_TIMEOUT_SECONDS, it is answered right
+    away with 503 and Retry-After. Under overload the worker then keeps serving
+    what it admitted at normal latency, instead of every request slowing down
+    together until clients time out. /metrics is never queued, so the overload
+    stays visible to the scraper."""
+
+    EXEMPT_PATHS = {"/metrics"}
+
+    def __init__(self, app,
+                 max_in_flight: int = settings.per_worker(settings.ADMISSION_MAX_IN_FLIGHT),
+                 max_queued: int = settings.per_worker(settings.ADMISSION_MAX_QUEUED, minimum=0),
+                 queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+                 retry_after: int = settings.ADMISSION_RETRY_AFTER_SECONDS):
+        self.app = app
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._waiting = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if self._slots.locked():
+            if self._waiting >= self.max_queued:
+                await self._shed(scope, receive, send, "queue_full")
+                return
+            self._waiting += 1
+            admission_queued.inc(())
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                await self._shed(scope, receive, send, "queue_timeout")
+                return
+            finally:
+                self._waiting -= 1
+                admission_queued.dec(())
+        else:
+            await self._slots.acquire()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._slots.release()
+
+    async def _shed(self, scope, receive, send, reason: str) -> None:
+        admission_shed.inc((reason,))
+        response = JSONResponse(
+            {"detail": "Server is busy, please try again later !"},
+            status_code=503,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+        await response(scope, receive, send)
@@ -8,8 +8,91 @@ JWT_ALGORITHM = settings.JWT_ALGORITHM
 JWT_EXPIRATION_MINUTES = settings.JWT_EXPIRATION_MINUTES
 REFRESH_TOKEN_HOURS = settings.REFRESH_TOKEN_HOURS
 
+#TOKEN REVOCATION
+REVOCATION_FILTER_CAPACITY = settings.REVOCATION_FILTER_CAPACITY
+REVOCATION_FILTER_ERROR_RATE = settings.REVOCATION_FILTER_ERROR_RATE
+REVOCATION_SYNC_SECONDS = settings.REVOCATION_SYNC_SECONDS
+REVOCATION_PRUNE_SECONDS = settings.REVOCATION_PRUNE_SECONDS
+
+#PASSWORD HASHING
+PASSWORD_HASH_EXECUTOR = settings.PASSWORD_HASH_EXECUTOR
+PASSWORD_HASH_WORKERS = settings.per_worker(settings.PASSWORD_HASH_WORKERS)
+PASSWORD_HASH_MAX_QUEUE = settings.per_worker(settings.PASSWORD_HASH_MAX_QUEUE, minimum=0)
+
+#PAGINATION
+PAGE_SIZE_DEFAULT = settings.PAGE_SIZE_DEFAULT
+PAGE_SIZE_MAX = settings.PAGE_SIZE_MAX
+SEARCH_TOTAL_COUNT_CAP = settings.SEARCH_TOTAL_COUNT_CAP
+
+#SUMMARIES
+SUMMARY_EXCERPT_LENGTH = settings.SUMMARY_EXCERPT_LENGTH
+
+#SEARCH RANKING
+SEARCH_RANK_NORMALIZATION = settings.SEARCH_RANK_NORMALIZATION
+
+#SEARCH CACHE
+SEARCH_CACHE_SIZE = settings.per_worker(settings.SEARCH_CACHE_SIZE)
+SEARCH_CACHE_TTL_SECONDS = settings.SEARCH_CACHE_TTL_SECONDS
+
+#FEED
+FEED_SNAPSHOT_TTL_SECONDS = settings.FEED_SNAPSHOT_TTL_SECONDS
+
+#PRINCIPAL CACHE
+PRINCIPAL_CACHE_SIZE = settings.per_worker(settings.PRINCIPAL_CACHE_SIZE)
+PRINCIPAL_CACHE_TTL_SECONDS = settings.PRINCIPAL_CACHE_TTL_SECONDS
+API_WORKERS = settings.API_WORKERS
+
 #AWS USER
 AWS_SECRET_ACCESS_KEY = settings.AWS_SECRET_ACCESS_KEY
 AWS_ACCESS_KEY = settings.AWS_ACCESS_KEY
 AWS_REGION = settings.AWS_REGION
-S3_BUCKET = settings.S3_BUCKET
\ No newline at end of file
+S3_BUCKET = settings.S3_BUCKET
+S3_ENDPOINT_URL = settings.S3_ENDPOINT_URL
+S3_MAX_POOL_CONNECTIONS = settings.per_worker(settings.S3_MAX_POOL_CONNECTIONS)
+S3_KEEPALIVE_SECONDS = settings.S3_KEEPALIVE_SECONDS
+S3_CONNECT_RETRY_BASE_SECONDS = settings.S3_CONNECT_RETRY_BASE_SECONDS
+S3_CONNECT_RETRY_MAX_SECONDS = settings.S3_CONNECT_RETRY_MAX_SECONDS
+
+#HTTP CACHING
+POST_SHARED_CACHE_SECONDS = settings.POST_SHARED_CACHE_SECONDS
+
+#PRESIGNED URLS
+PRESIGNED_URL_EXPIRES_SECONDS = settings.PRESIGNED_URL_EXPIRES_SECONDS
+PRESIGNED_URL_SAFETY_MARGIN_SECONDS = settings.PRESIGNED_URL_SAFETY_MARGIN_SECONDS
+PRESIGNED_URL_CACHE_SIZE = settings.per_worker(settings.PRESIGNED_URL_CACHE_SIZE)
+
+#DOCUMENT UPLOADS
+MAX_UPLOAD_SIZE_MB = settings.MAX_UPLOAD_SIZE_MB
+S3_UPLOAD_PART_SIZE_MB = settings.S3_UPLOAD_PART_SIZE_MB
+S3_UPLOAD_MAX_CONCURRENCY = settings.S3_UPLOAD_MAX_CONCURRENCY
+
+#S3 OUTBOX
+S3_OUTBOX_IN_PROCESS = settings.S3_OUTBOX_IN_PROCESS
+S3_OUTBOX_BATCH_SIZE = min(settings.S3_OUTBOX_BATCH_SIZE, 1000)
+S3_OUTBOX_POLL_SECONDS = settings.S3_OUTBOX_POLL_SECONDS
+S3_OUTBOX_RETRY_BASE_SECONDS = settings.S3_OUTBOX_RETRY_BASE_SECONDS
+S3_OUTBOX_RETRY_MAX_SECONDS = settings.S3_OUTBOX_RETRY_MAX_SECONDS
+UPLOAD_INTENT_GRACE_SECONDS = settings.UPLOAD_INTENT_GRACE_SECONDS
+
+#DOCUMENT EXTRACTION
+EXTRACTION_IN_PROCESS = settings.EXTRACTION_IN_PROCESS
+EXTRACTION_WORKERS = settings.per_worker(settings.EXTRACTION_WORKERS)
+EXTRACTION_MAX_CHARS = settings.EXTRACTION_MAX_CHARS
+EXTRACTION_TIMEOUT_SECONDS = settings.EXTRACTION_TIMEOUT_SECONDS
+EXTRACTION_POLL_SECONDS = settings.EXTRACTION_POLL_SECONDS
+EXTRACTION_STALE_SECONDS = settings.EXTRACTION_STALE_SECONDS
+EXTRACTION_MAX_ATTEMPTS = settings.EXTRACTION_MAX_ATTEMPTS
+EXTRACTION_RETRY_BASE_SECONDS = settings.EXTRACTION_RETRY_BASE_SECONDS
+EXTRACTION_RETRY_MAX_SECONDS = settings.EXTRACTION_RETRY_MAX_SECONDS
+
+#RATE LIMITING
+RATE_LIMIT_ENABLED = settings.RATE_LIMIT_ENABLED
+RATE_LIMIT_BACKEND = settings.RATE_LIMIT_BACKEND
+RATE_LIMIT_MEMORY_MAX_KEYS = settings.RATE_LIMIT_MEMORY_MAX_KEYS
+RATE_LIMIT_CLIENT_IP_HEADER = settings.RATE_LIMIT_CLIENT_IP_HEADER
+RATE_LIMIT_POLICIES = {
+    "login": settings.RATE_LIMIT_LOGIN,
+    "register": settings.RATE_LIMIT_REGISTER,
+    "search": settings.RATE_LIMIT_SEARCH,
+    "upload": settings.RATE_LIMIT_UPLOAD,
+}
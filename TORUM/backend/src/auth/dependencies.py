@@ -2,36 +2,92 @@ from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import func
 from jose import JWTError
 from typing import List
 
+from backend.src.cache import TTLCache
+from backend.src.metrics import register_cache
 from backend.src.database import get_db
+from backend.src.notify import listen, is_listening
+from backend.src.auth.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS, API_WORKERS
 from backend.src.auth.models import User
 from backend.src.auth.exceptions import CredentialException, InvalidUser, PermissionException
 from backend.src.auth.services import decode_token
+from backend.src.auth.revocation import is_token_revoked
 from backend.src.auth.schemas import UserResponse
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), 
+# Resolved principals keyed by the "user_id" claim, so authenticated requests
+# skip the users lookup until the entry expires or the user is updated. Every
+# worker has its own cache, so a change to a user is broadcast on
+# PRINCIPAL_CHANNEL and each worker drops its entry; after a listener
+# reconnect, when notifications may have been missed, the whole cache goes.
+PRINCIPAL_CHANNEL = "principal_invalidated"
+
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+register_cache("principal", principal_cache)
+# Bumped by every invalidation. A lookup that raced one doesn't cache what it read.
+_invalidations = 0
+
+def invalidate_principal(user_id) -> None:
+    global _invalidations
+    _invalidations += 1
+    principal_cache.pop(str(user_id))
+
+def clear_principals() -> None:
+    global _invalidations
+    _invalidations += 1
+    principal_cache.clear()
+
+listen(PRINCIPAL_CHANNEL, invalidate_principal, on_connect=clear_principals)
+
+def principal_cache_enabled() -> bool:
+    """A single worker sees every change itself. With several, a cached principal
+    is only safe while this worker's listener is up to hear about the others'."""
+    return API_WORKERS <= 1 or is_listening()
+
+async def broadcast_principal_change(db: AsyncSession, user_id) -> None:
+    """Queue the invalidation in the caller's transaction; it reaches every worker when that commits."""
+    await db.execute(select(func.pg_notify(PRINCIPAL_CHANNEL, str(user_id))))
+
+async def get_current_user(token: str = Depends(oauth2_scheme),
                            db: AsyncSession = Depends(get_db)):
     try:
         payload = decode_token(token)
         email: str = payload.get("sub")
         token_type: str = payload.get("type")
+        user_id: str = payload.get("user_id")
         if not email or token_type != "access":
             raise CredentialException()
     except JWTError:
         raise CredentialException()
-    result = await db.execute(select(User).where(User.email == email))
+    if await is_token_revoked(db, payload.get("jti")):
+        raise CredentialException()
+
+    use_cache = bool(user_id) and principal_cache_enabled()
+    if use_cache:
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+    invalidations = _invalidations
+    if user_id:
+        result = await db.execute(select(User).where(User.user_id == user_id))
+    else:
+        # Tokens minted before the "user_id" claim existed are resolved by email and not cached.
+        result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
     if not user:
         raise InvalidUser()
-    return user
+    principal = UserResponse.model_validate(user)
+    if use_cache and invalidations == _invalidations:
+        principal_cache.set(user_id, principal)
+    return principal
 
 def require_role(required_roles: List[str]):
     async def role_checker(current_user: UserResponse = Depends(get_current_user)):
         if current_user.user_role not in required_roles:
             raise PermissionException()
         return current_user
-    return role_checker
\ No newline at end of file
+    return role_checker
@@ -12,10 +12,24 @@ class UserExistedCheck(HTTPException):
         )
 
 class SizeTooLarge(HTTPException):
+    def __init__(self, limit_mb: int = 20):
+        super().__init__(
+            status_code=400,
+            detail=f"File size exceeds {limit_mb}MB limit !"
+        )
+
+class InvalidFileType(HTTPException):
     def __init__(self):
         super().__init__(
             status_code=400,
-            detail="File size exceeds 20MB limit !"
+            detail="Only .pdf and .docx files are allowed !"
+        )
+
+class InvalidUploadForm(HTTPException):
+    def __init__(self, detail="Malformed upload form !"):
+        super().__init__(
+            status_code=400,
+            detail=detail
         )
 
 class EmptyQueryException(HTTPException):
@@ -25,6 +39,20 @@ class EmptyQueryException(HTTPException):
             detail="Search query can't be empty !"
         )
 
+class InvalidCursor(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=400,
+            detail="Invalid pagination cursor !"
+        )
+
+class InvalidFields(HTTPException):
+    def __init__(self, fields):
+        super().__init__(
+            status_code=400,
+            detail=f"Invalid fields: {', '.join(fields)} !" if fields else "Fields can't be empty !"
+        )
+
 #---------------------------------------------------------------#
 
 ####     HTTP CODE 401     #####
@@ -89,6 +117,18 @@ class DocumentNotFound(HTTPException):
 
 #---------------------------------------------------------------#
 
+####     HTTP CODE 429     #####
+
+class RateLimited(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=429,
+            detail="Too many requests, please slow down !",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+#---------------------------------------------------------------#
+
 ####     HTTP CODE 500     #####
 
 class FileUploadFailed(HTTPException):
@@ -98,18 +138,31 @@ class FileUploadFailed(HTTPException):
             detail=detail
         )
 
-class FileDeletionFailed(HTTPException):
-    def __init__(self, detail="Delete File from AWS S3 Failed"):
+class PresignedURLFailed(HTTPException):
+    def __init__(self):
         super().__init__(
             status_code=500,
-            detail=detail
+            detail="Generate presigned URL failed !"
         )
 
-class PresignedURLFailed(HTTPException):
+#---------------------------------------------------------------#
+
+####     HTTP CODE 503     #####
+
+class StorageUnavailable(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail="File storage is unavailable, please try again later !",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+class PasswordHashingBusy(HTTPException):
     def __init__(self):
         super().__init__(
-            status_code=500,
-            detail="Generate presigned URL failed !"
+            status_code=503,
+            detail="Server is busy, please try again later !",
+            headers={"Retry-After": "1"},
         )
 
 #---------------------------------------------------------------#
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""Full-text indexing of uploaded PDF/DOCX contents.
+
+Every document row starts out with extraction_status "pending". The worker
+claims due pending rows with SKIP LOCKED and streams each object from S3 into a
+temporary file, 1 MiB at a time. It then parses the file in a parser process
+of its own, so the CPU-heavy work never runs on the event loop. At
+most EXTRACTION_MAX_CHARS of text is kept, and the parsers stop reading once
+they have that much, so memory stays bounded however large the file is.
+Postgres turns the text into body_vector, and the generated search_vector
+picks it up at weight D, below the title, description and tags.
+
+A download that fails puts the row back to pending with a due time pushed
+forward by capped exponential backoff. After EXTRACTION_MAX_ATTEMPTS claims,
+or straight away when the object doesn't exist, the row is marked failed. A
+parse that runs past EXTRACTION_TIMEOUT_SECONDS is killed with its process.
+
+Like the S3 outbox, the worker runs inside each API process
+(EXTRACTION_IN_PROCESS) and/or standalone. The backfill mode works through
+every document that is due and then exits:
+
+    python -m backend.src.auth.extraction                             # run forever
+    python -m backend.src.auth.extraction --backfill [--retry-failed]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import zipfile
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from xml.etree import ElementTree
+
+from botocore.exceptions import BotoCoreError, ClientError
+from pypdf import PdfReader
+from sqlalchemy import and_, text, update
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from backend.src.database import SessionLocal
+from backend.src.metrics import timed
+from backend.src.auth.config import S3_BUCKET, EXTRACTION_WORKERS, EXTRACTION_MAX_CHARS, EXTRACTION_TIMEOUT_SECONDS, EXTRACTION_POLL_SECONDS, EXTRACTION_STALE_SECONDS, EXTRACTION_MAX_ATTEMPTS, EXTRACTION_RETRY_BASE_SECONDS, EXTRACTION_RETRY_MAX_SECONDS
+from backend.src.auth.models import Reading_Documents
+from backend.src.auth.search import broadcast_content_change, bump_content_generation
+from backend.src.auth.utils import start_s3_client, stop_s3_client
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+MISSING_OBJECT_CODES = {"NoSuchKey", "404"}
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+#---------------------------------------------------------------#
+
+####     PARSERS (run in a parser process)     ####
+
+def _extract_pdf(path: str, max_chars: int) -> str:
+    parts, length = [], 0
+    for page in PdfReader(path).pages:
+        page_text = page.extract_text() or ""
+        parts.append(page_text)
+        length += len(page_text)
+        if length >= max_chars:
+            break
+    return "\n".join(parts)
+
+def _extract_docx(path: str, max_chars: int) -> str:
+    parts, length = [], 0
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as document:
+        for _, element in ElementTree.iterparse(document, events=("end",)):
+            if element.tag == WORD_NAMESPACE + "t" and element.text:
+                parts.append(element.text)
+                length += len(element.text)
+            elif element.tag == WORD_NAMESPACE + "p":
+                parts.append("\n")
+                # Paragraphs are done with once closed; dropping them keeps the tree small.
+                element.clear()
+            if length >= max_chars:
+                break
+    return "".join(parts)
+
+def extract_text(path: str, extension: str, max_chars: int) -> str:
+    extracted = _extract_pdf(path, max_chars) if extension == ".pdf" else _extract_docx(path, max_chars)
+    # Postgres text can't hold NUL characters.
+    return extracted[:max_chars].replace("\x00", " ")
+
+####     END PARSERS     ####
+
+#---------------------------------------------------------------#
+
+####     WORKER     ####
+
+_wake = asyncio.Event()
+
+class ParserProcess:
+    """A single parser process owned by one worker slot. The slot submits one
+    parse at a time, so a timeout measures that parse alone and never time
+    spent queued behind another. Cancelling the wait doesn't stop a parse
+    that is already running, so on timeout, or when the process has died,
+    it is killed and a fresh one starts with the next parse."""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def run(self, timeout: float, function, *args):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, BrokenProcessPool):
+            self.kill()
+            raise
+
+    def kill(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # ProcessPoolExecutor has no public way to stop a running call before Python 3.14.
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+
+def wake_extraction_worker() -> None:
+    _wake.set()
+
+def retry_delay(attempts: int) -> float:
+    delay = min(EXTRACTION_RETRY_MAX_SECONDS, EXTRACTION_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+async def claim_document(session_factory=SessionLocal):
+    """Mark the pending document that has been due longest as processing and
+    return (docs_id, docs_file_path, extraction_attempts) with this claim counted."""
+    oldest_pending = (
+        select(Reading_Documents.docs_id)
+        .where(and_(Reading_Documents.extraction_status == PENDING,
+                    Reading_Documents.extraction_updated_at <= func.now()))
+        .order_by(Reading_Documents.extraction_updated_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    async with session_factory() as session:
+        async with session.begin():
+            result = await session.execute(
+                update(Reading_Documents)
+                .where(Reading_Documents.docs_id == oldest_pending)
+                .values(extraction_status=PROCESSING, extraction_updated_at=func.now(),
+                        extraction_attempts=Reading_Documents.extraction_attempts + 1)
+                .returning(Reading_Documents.docs_id, Reading_Documents.docs_file_path, Reading_Documents.extraction_attempts)
+            )
+            return result.first()
+
+async def requeue_stale(session_factory=SessionLocal) -> None:
+    async with session_factory() as session:
+        async with session.begin():
+            await session.execute(
+                update(Reading_Documents)
+                .where(and_(Reading_Documents.extraction_status == PROCESSING,
+                            Reading_Documents.extraction_updated_at < func.now() - text(f"interval '{int(EXTRACTION_STALE_SECONDS)} seconds'")))
+                .values(extraction_status=PENDING, extraction_updated_at=func.now())
+            )
+
+async def finish_document(docs_id, status: str, body: Optional[str] = None, error: Optional[str] = None,
+                          retry_in: float = 0, session_factory=SessionLocal) -> None:
+    due = func.now() + text(f"interval '{retry_in:.3f} seconds'") if retry_in else func.now()
+    values = {"extraction_status": status, "extraction_error": error, "extraction_updated_at": due}
+    if status == DONE:
+        values["body_vector"] = func.to_tsvector('english', body)
+    async with session_factory() as session:
+        async with session.begin():
+            await session.execute(update(Reading_Documents).where(Reading_Documents.docs_id == docs_id).values(**values))
+            if status == DONE:
+                # The new body text changes search results in every API worker.
+                await broadcast_content_change(session)
+
+async def download_to_file(client, s3_key: str, file) -> None:
+    with timed("s3", "get_object"):
+        response = await client.get_object(Bucket=S3_BUCKET, Key=s3_key)
+        async with response["Body"] as stream:
+            while chunk := await stream.read(DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+    file.flush()
+
+def is_missing_object(error: Exception) -> bool:
+    return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in MISSING_OBJECT_CODES
+
+async def extract_document(client, parser: ParserProcess, docs_id, s3_key: str, attempts: int,
+                           session_factory=SessionLocal) -> None:
+    extension = os.path.splitext(s3_key)[1].lower()
+    with tempfile.NamedTemporaryFile(suffix=extension) as file:
+        try:
+            await download_to_file(client, s3_key, file)
+        except (ClientError, BotoCoreError) as e:
+            print("Extraction download error: ", {e})
+            if is_missing_object(e) or attempts >= EXTRACTION_MAX_ATTEMPTS:
+                await finish_document(docs_id, FAILED, error=f"{type(e).__name__}: {e}"[:1000], session_factory=session_factory)
+            else:
+                await finish_document(docs_id, PENDING, error=str(e)[:1000], retry_in=retry_delay(attempts), session_factory=session_factory)
+            return
+        try:
+            with timed("extraction", extension.lstrip(".")):
+                body = await parser.run(EXTRACTION_TIMEOUT_SECONDS, extract_text, file.name, extension, EXTRACTION_MAX_CHARS)
+        except Exception as e:
+            print("Extraction error: ", {e})
+            await finish_document(docs_id, FAILED, error=f"{type(e).__name__}: {e}"[:1000], session_factory=session_factory)
+            return
+    await finish_document(docs_id, DONE, body=body, session_factory=session_factory)
+    bump_content_generation()
+
+async def _extraction_slot(client_factory, session_factory, stop_when_idle: bool) -> None:
+    parser = ParserProcess()
+    try:
+        while True:
+            claimed = None
+            try:
+                claimed = await claim_document(session_factory)
+                if claimed is not None:
+                    await extract_document(await client_factory(), parser, claimed.docs_id, claimed.docs_file_path,
+                                           claimed.extraction_attempts, session_factory)
+            except Exception as e:
+                print("Extraction worker error: ", {e})
+                # Don't spin on a database or S3 client that keeps failing.
+                claimed = None
+            if claimed is not None:
+                continue
+            if stop_when_idle:
+                return
+            try:
+                await asyncio.wait_for(_wake.wait(), EXTRACTION_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _wake.clear()
+    finally:
+        parser.kill()
+
+async def run_extraction_worker(client_factory=start_s3_client, session_factory=SessionLocal, stop_when_idle: bool = False) -> None:
+    """EXTRACTION_WORKERS claim loops, each with its own parser process."""
+    try:
+        await requeue_stale(session_factory)
+    except Exception as e:
+        print("Extraction worker error: ", {e})
+    await asyncio.gather(*(_extraction_slot(client_factory, session_factory, stop_when_idle) for _ in range(EXTRACTION_WORKERS)))
+
+####     END WORKER     ####
+
+#---------------------------------------------------------------#
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backfill", action="store_true", help="process every pending document, then exit")
+    parser.add_argument("--retry-failed", action="store_true", help="queue failed documents again first")
+    args = parser.parse_args()
+    if args.retry_failed:
+        async with SessionLocal() as session:
+            async with session.begin():
+                await session.execute(
+                    update(Reading_Documents).where(Reading_Documents.extraction_status == FAILED)
+                    .values(extraction_status=PENDING, extraction_error=None, extraction_updated_at=func.now(), extraction_attempts=0)
+                )
+    try:
+        await run_extraction_worker(stop_when_idle=args.backfill)
+    finally:
+        await stop_s3_client()
+
+if __name__ == "__main__":
+    asyncio.run(main())
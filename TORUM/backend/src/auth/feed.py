@@ -0,0 +1,90 @@
+import asyncio
+import time
+import uuid
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.future import select
+
+from backend.src.database import SessionLocal
+from backend.src.metrics import register_cache
+from backend.src.auth.config import FEED_SNAPSHOT_TTL_SECONDS, PAGE_SIZE_MAX
+from backend.src.auth.models import Post, User
+from backend.src.auth.projections import POST_SUMMARY_COLUMNS, summary_columns
+from backend.src.auth.search import content_cache_enabled, content_generation
+
+# Site-wide feed of the most recent posts, newest first, with keyset pages on
+# (created_at, post_id) served by idx_posts_created. The author's username and
+# role come from the same query through a join on users.
+FEED_COLUMNS = {
+    **POST_SUMMARY_COLUMNS,
+    "author_username": User.username,
+    "author_role": User.user_role,
+}
+FEED_KEYS = ["created_at", "post_id"]
+
+def feed_query(columns: List, limit: int, after: Optional[List] = None):
+    query = (select(*columns).join(User, Post.post_owner == User.user_id)
+             .order_by(Post.created_at.desc(), Post.post_id.desc()).limit(limit + 1))
+    if after:
+        after_created_at, after_id = after
+        query = query.where(tuple_(Post.created_at, Post.post_id) < tuple_(datetime.fromisoformat(after_created_at), uuid.UUID(after_id)))
+    return query
+
+class FeedSnapshot:
+    """The first PAGE_SIZE_MAX + 1 feed rows with every column, so any first-page
+    request is a slice of it. Nearly all feed traffic is the first page, and this
+    way it costs no query at all.
+
+    The snapshot remembers the content generation it was built at. A post write
+    or a change to an author's username or role bumps the generation, and the
+    next request rebuilds it; a lock makes concurrent requests wait for that one
+    query instead of all running it. Writes in other processes reach this
+    generation through the content broadcast; when this worker can't hear them,
+    every request queries instead of trusting the snapshot. The snapshot is always read
+    from the primary: a lagging replica could otherwise store a page without the
+    write that bumped the generation and serve it to everyone, the writer too."""
+
+    def __init__(self, ttl_seconds: float = FEED_SNAPSHOT_TTL_SECONDS, session_factory=SessionLocal):
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory
+        self._rows: Optional[List[Dict]] = None
+        self._generation = -1
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _is_fresh(self) -> bool:
+        return self._rows is not None and self._generation == content_generation() and time.monotonic() < self._expires_at
+
+    async def _load(self) -> List[Dict]:
+        async with self.session_factory() as session:
+            result = await session.execute(feed_query(summary_columns(FEED_COLUMNS, FEED_COLUMNS), PAGE_SIZE_MAX))
+            return [dict(row) for row in result.mappings()]
+
+    async def rows(self) -> List[Dict]:
+        if not content_cache_enabled():
+            self._misses += 1
+            return await self._load()
+        if self._is_fresh():
+            self._hits += 1
+            return self._rows
+        async with self._lock:
+            if self._is_fresh():
+                self._hits += 1
+                return self._rows
+            self._misses += 1
+            generation = content_generation()
+            self._rows = await self._load()
+            self._generation = generation
+            self._expires_at = time.monotonic() + self.ttl_seconds
+            return self._rows
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._rows or ()), "hits": self._hits, "misses": self._misses, "evictions": 0}
+
+feed_snapshot = FeedSnapshot()
+register_cache("feed", feed_snapshot)
@@ -1,8 +1,8 @@
 import uuid
 import os
 
-from sqlalchemy import Column, String, Integer, Boolean, Text, UUID, ForeignKey, DateTime, func
-from sqlalchemy.orm import relationship, validates
+from sqlalchemy import BigInteger, Column, Computed, Float, Identity, String, Integer, Boolean, Text, UUID, ForeignKey, DateTime, func
+from sqlalchemy.orm import relationship, validates, deferred
 from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from backend.src.database import Base
@@ -42,7 +42,12 @@ class Post(Base):
     post_content = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    search_vector = Column(TSVECTOR)
+    # Maintained by Postgres: the title outranks the body.
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(post_title, '')), 'A') || "
+        "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(post_content, '')), 'B')",
+        persisted=True
+    )))
 
     owner = relationship("User", back_populates="post")
 
@@ -62,7 +67,21 @@ class Reading_Documents(Base):
     docs_tags = Column(String, default="Documents")
     docs_file_path = Column(String, nullable=False)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
-    search_vector = Column(TSVECTOR)
+    # Text extracted from the file itself: pending -> processing -> done | failed
+    extraction_status = Column(String, nullable=False, default="pending", server_default="pending")
+    extraction_error = Column(Text)
+    # For a pending row, the time it becomes due; retries push it into the future.
+    extraction_updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    extraction_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    body_vector = deferred(Column(TSVECTOR))
+    # Maintained by Postgres: title, then description, then tags, then the file's text (unweighted, D).
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(docs_title, '')), 'A') || "
+        "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(docs_description, '')), 'B') || "
+        "setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(docs_tags, '')), 'C') || "
+        "coalesce(body_vector, ''::tsvector)",
+        persisted=True
+    )))
 
     documents_owner = relationship("User", back_populates="docs")
 
@@ -76,4 +95,52 @@ class Reading_Documents(Base):
 
 ####     END READING DOCUMENTS TABLE      ####
 
-#---------------------------------------------------------------#
\ No newline at end of file
+#---------------------------------------------------------------#
+
+####     S3 OUTBOX TABLE      ####
+
+class S3_Outbox(Base):
+    __tablename__ = "s3_outbox"
+
+    outbox_id = Column(BigInteger, Identity(), primary_key=True)
+    s3_key = Column(String, nullable=False)
+    reason = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+####     END S3 OUTBOX TABLE      ####
+
+#---------------------------------------------------------------#
+
+####     RATE LIMIT BUCKETS TABLE      ####
+
+# Token buckets shared by every worker when RATE_LIMIT_BACKEND=postgres.
+# UNLOGGED: losing them in a crash only resets the limits, so skip the WAL.
+class Rate_Limit_Buckets(Base):
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    bucket_key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+####     END RATE LIMIT BUCKETS TABLE      ####
+
+#---------------------------------------------------------------#
+
+####     REVOKED TOKENS TABLE      ####
+
+# jti of tokens ended early by logout or spent by refresh rotation. A row is
+# only needed until the token would have expired anyway.
+class Revoked_Tokens(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+####     END REVOKED TOKENS TABLE      ####
+
+#---------------------------------------------------------------#
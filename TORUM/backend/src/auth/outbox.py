@@ -0,0 +1,118 @@
+"""Transactional outbox for S3 object deletes.
+
+Routes never call S3 to delete. They add an S3_Outbox row in the same
+transaction as the row change, so the object is deleted if and only if the
+change commits. The worker claims due rows with FOR UPDATE SKIP LOCKED and
+removes up to 1000 keys per delete_objects call. Failed keys are retried with
+capped exponential backoff. Because of SKIP LOCKED, any number of workers can
+run side by side: one per API process (S3_OUTBOX_IN_PROCESS) and/or standalone:
+
+    python -m backend.src.auth.outbox
+
+Uploads use the same table for orphan cleanup. Before the first byte goes to
+S3, the route commits an "upload_intent" row that only becomes due after
+UPLOAD_INTENT_GRACE_SECONDS. The document insert deletes that row in its own
+transaction. If the request dies first, the worker later removes the object.
+"""
+import asyncio
+import random
+
+from datetime import datetime, timedelta, timezone
+from botocore.exceptions import BotoCoreError, ClientError
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from backend.src.database import SessionLocal
+from backend.src.metrics import timed
+from backend.src.auth.config import S3_BUCKET, S3_OUTBOX_BATCH_SIZE, S3_OUTBOX_POLL_SECONDS, S3_OUTBOX_RETRY_BASE_SECONDS, S3_OUTBOX_RETRY_MAX_SECONDS, UPLOAD_INTENT_GRACE_SECONDS
+from backend.src.auth.models import S3_Outbox
+from backend.src.auth.utils import start_s3_client, stop_s3_client
+
+DELETE = "delete"
+UPLOAD_INTENT = "upload_intent"
+
+_wake = asyncio.Event()
+
+def enqueue_s3_delete(db: AsyncSession, s3_key: str) -> None:
+    """Queue the object for deletion; it happens only if the caller's transaction commits."""
+    db.add(S3_Outbox(s3_key=s3_key, reason=DELETE))
+
+def upload_intent(s3_key: str) -> S3_Outbox:
+    return S3_Outbox(
+        s3_key=s3_key,
+        reason=UPLOAD_INTENT,
+        available_at=datetime.now(timezone.utc) + timedelta(seconds=UPLOAD_INTENT_GRACE_SECONDS),
+    )
+
+def wake_outbox_worker() -> None:
+    """Have this process's worker look at the outbox now instead of at its next poll."""
+    _wake.set()
+
+def retry_delay(attempts: int) -> float:
+    delay = min(S3_OUTBOX_RETRY_MAX_SECONDS, S3_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+async def process_outbox_batch(client, session_factory=SessionLocal, batch_size: int = S3_OUTBOX_BATCH_SIZE) -> int:
+    """Delete the objects of one batch of due outbox rows. Returns how many rows were claimed."""
+    async with session_factory() as session:
+        async with session.begin():
+            result = await session.execute(
+                select(S3_Outbox).where(S3_Outbox.available_at <= func.now())
+                .order_by(S3_Outbox.available_at).limit(batch_size).with_for_update(skip_locked=True)
+            )
+            rows = result.scalars().all()
+            if not rows:
+                return 0
+
+            keys = list(dict.fromkeys(row.s3_key for row in rows))
+            try:
+                with timed("s3", "delete_objects"):
+                    response = await client.delete_objects(
+                        Bucket=S3_BUCKET,
+                        Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
+                    )
+                failed = {error["Key"]: f"{error.get('Code')}: {error.get('Message')}" for error in response.get("Errors", [])}
+            except (ClientError, BotoCoreError) as e:
+                print("Outbox delete_objects error: ", {e})
+                failed = {key: str(e) for key in keys}
+
+            now = datetime.now(timezone.utc)
+            done = []
+            for row in rows:
+                if row.s3_key in failed:
+                    row.attempts += 1
+                    row.last_error = failed[row.s3_key]
+                    row.available_at = now + timedelta(seconds=retry_delay(row.attempts))
+                else:
+                    done.append(row.outbox_id)
+            if done:
+                await session.execute(delete(S3_Outbox).where(S3_Outbox.outbox_id.in_(done)))
+            return len(rows)
+
+async def run_outbox_worker(client_factory=start_s3_client, session_factory=SessionLocal) -> None:
+    """Drain the outbox forever. Full batches are followed immediately by the next one;
+    otherwise the worker sleeps until the next poll or a wake_outbox_worker() call."""
+    while True:
+        _wake.clear()
+        claimed = 0
+        try:
+            claimed = await process_outbox_batch(await client_factory(), session_factory)
+        except Exception as e:
+            print("Outbox worker error: ", {e})
+        if claimed >= S3_OUTBOX_BATCH_SIZE:
+            continue
+        try:
+            await asyncio.wait_for(_wake.wait(), S3_OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+async def main() -> None:
+    try:
+        await run_outbox_worker()
+    finally:
+        await stop_s3_client()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from backend.src.auth.config import JWT_SECRET_KEY
+from backend.src.auth.exceptions import InvalidCursor
+
+# Cursors are opaque to clients: base64(json payload + truncated HMAC), so a
+# tampered or foreign cursor is rejected instead of steering the query.
+_CURSOR_KEY = hashlib.sha256(b"torum-cursor:" + JWT_SECRET_KEY.encode()).digest()
+_SIGNATURE_SIZE = 16
+
+def encode_cursor(kind: str, values: Any) -> str:
+    payload = json.dumps({"k": kind, "v": values}, default=str, separators=(",", ":")).encode()
+    signature = hmac.new(_CURSOR_KEY, payload, hashlib.sha256).digest()[:_SIGNATURE_SIZE]
+    return base64.urlsafe_b64encode(payload + signature).rstrip(b"=").decode()
+
+def decode_cursor(kind: str, cursor: str) -> Any:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    except (binascii.Error, ValueError):
+        raise InvalidCursor()
+    payload, signature = raw[:-_SIGNATURE_SIZE], raw[-_SIGNATURE_SIZE:]
+    expected = hmac.new(_CURSOR_KEY, payload, hashlib.sha256).digest()[:_SIGNATURE_SIZE]
+    if not hmac.compare_digest(signature, expected):
+        raise InvalidCursor()
+    data = json.loads(payload)
+    if data.get("k") != kind:
+        raise InvalidCursor()
+    return data["v"]
+
+def paginate(rows: Sequence, limit: int, kind: str, key: Callable[[Any], List[Any]]) -> Tuple[List, Optional[str]]:
+    """Split rows fetched with LIMIT limit + 1 into the page and the cursor of the next one."""
+    page = list(rows[:limit])
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(kind, key(page[-1]))
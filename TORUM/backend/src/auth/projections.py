@@ -0,0 +1,46 @@
+from sqlalchemy.sql import func
+from typing import Dict, Iterable, List, Optional
+
+from backend.src.auth.config import SUMMARY_EXCERPT_LENGTH
+from backend.src.auth.exceptions import InvalidFields
+from backend.src.auth.models import Post, Reading_Documents
+
+# Columns behind the list/search summaries. Only these are selected, so list
+# responses never load search_vector or a full post_content body from Postgres.
+POST_SUMMARY_COLUMNS = {
+    "post_id": Post.post_id,
+    "post_owner": Post.post_owner,
+    "post_title": Post.post_title,
+    "excerpt": func.left(Post.post_content, SUMMARY_EXCERPT_LENGTH),
+    "created_at": Post.created_at,
+    "updated_at": Post.updated_at,
+}
+
+DOCUMENT_SUMMARY_COLUMNS = {
+    "docs_id": Reading_Documents.docs_id,
+    "docs_owner": Reading_Documents.docs_owner,
+    "docs_title": Reading_Documents.docs_title,
+    "docs_description": Reading_Documents.docs_description,
+    "docs_tags": Reading_Documents.docs_tags,
+    "docs_file_path": Reading_Documents.docs_file_path,
+    "uploaded_at": Reading_Documents.uploaded_at,
+    "extraction_status": Reading_Documents.extraction_status,
+}
+
+def parse_fields(fields: Optional[str], model) -> List[str]:
+    """Validate a comma-separated ?fields= sparse fieldset against a summary model."""
+    if not fields:
+        return list(model.model_fields)
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in model.model_fields]
+    if unknown or not requested:
+        raise InvalidFields(unknown)
+    return requested
+
+def summary_columns(columns: Dict, output_fields: Iterable[str], required: Iterable[str] = ()) -> List:
+    """Labelled column list for the requested fields plus the ones the query itself needs (keyset keys, S3 key)."""
+    names = dict.fromkeys([*output_fields, *required])
+    return [columns[name].label(name) for name in names if name in columns]
+
+def project(row: Dict, output_fields: Iterable[str]) -> Dict:
+    return {name: row[name] for name in output_fields if name in row}
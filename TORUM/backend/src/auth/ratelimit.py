@@ -0,0 +1,166 @@
+import math
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from fastapi import Request
+from jose import JWTError
+from sqlalchemy import text
+
+from backend.src.database import SessionLocal
+from backend.src.metrics import rate_limited
+from backend.src.auth.config import RATE_LIMIT_ENABLED, RATE_LIMIT_BACKEND, RATE_LIMIT_MEMORY_MAX_KEYS, RATE_LIMIT_CLIENT_IP_HEADER, RATE_LIMIT_POLICIES
+from backend.src.auth.exceptions import RateLimited
+from backend.src.auth.services import decode_token
+
+# Per-client token buckets for the routes that are expensive to serve: bcrypt
+# on /login and /register, prefix tsquery scans on /search, and 20 MB streams on
+# /upload-reading-documents. Each check takes one token from the client's bucket
+# for that policy. An empty bucket is a 429 with Retry-After, answered before
+# the route has done any work.
+
+class RateLimitPolicy(NamedTuple):
+    name: str
+    burst: int
+    per_seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.burst / self.per_seconds
+
+def parse_policy(name: str, spec: str) -> RateLimitPolicy:
+    burst, _, per_seconds = spec.partition("/")
+    return RateLimitPolicy(name, int(burst), float(per_seconds))
+
+POLICIES = {name: parse_policy(name, spec) for name, spec in RATE_LIMIT_POLICIES.items()}
+
+#---------------------------------------------------------------#
+
+####     BACKENDS     ####
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> float:
+        """Take one token from the bucket at key. Returns 0 when the request may
+        go ahead, otherwise the seconds until a token is available."""
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Buckets in this process. With API_WORKERS > 1 every worker counts on its
+    own, so a client gets up to API_WORKERS times the policy."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MEMORY_MAX_KEYS):
+        self.max_keys = max_keys
+        # key -> [tokens, monotonic time of the last refill]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(policy.burst), now]
+            # The least recently used buckets have had the longest to refill, so dropping them costs little.
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        tokens = min(policy.burst, bucket[0] + (now - bucket[1]) * policy.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / policy.rate
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """Buckets in the rate_limit_buckets table, shared by every worker. One
+    upsert refills and takes a token atomically under the row lock. A bucket
+    that is empty is left untouched, so no row comes back and the next token
+    is at most 1 / rate seconds away. If the database can't be reached, the
+    check fails open and the request goes ahead."""
+
+    ACQUIRE = text("""
+        INSERT INTO rate_limit_buckets AS bucket (bucket_key, tokens, updated_at)
+        VALUES (:key, :burst - 1, now())
+        ON CONFLICT (bucket_key) DO UPDATE
+        SET tokens = least(:burst, bucket.tokens + extract(epoch FROM now() - bucket.updated_at) * :rate) - 1,
+            updated_at = now()
+        WHERE least(:burst, bucket.tokens + extract(epoch FROM now() - bucket.updated_at) * :rate) >= 1
+        RETURNING tokens
+    """)
+    # A bucket idle for longer than its policy's window is full again, so deleting it changes nothing.
+    PRUNE = text("DELETE FROM rate_limit_buckets WHERE updated_at < now() - make_interval(secs => :idle_seconds)")
+    PRUNE_EVERY_SECONDS = 60
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._next_prune = 0.0
+
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> float:
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(self.ACQUIRE, {"key": key, "burst": policy.burst, "rate": policy.rate})
+                allowed = result.first() is not None
+                if time.monotonic() >= self._next_prune:
+                    self._next_prune = time.monotonic() + self.PRUNE_EVERY_SECONDS
+                    await session.execute(self.PRUNE, {"idle_seconds": max(p.per_seconds for p in POLICIES.values())})
+                await session.commit()
+        except Exception as e:
+            print("Rate limit backend error: ", {e})
+            return 0.0
+        return 0.0 if allowed else 1 / policy.rate
+
+_backend: Optional[RateLimitBackend] = None
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    global _backend
+    if _backend is None:
+        _backend = PostgresRateLimitBackend() if RATE_LIMIT_BACKEND == "postgres" else MemoryRateLimitBackend()
+    return _backend
+
+def set_rate_limit_backend(backend: Optional[RateLimitBackend]) -> None:
+    """Plug in another shared store; None goes back to the configured backend."""
+    global _backend
+    _backend = backend
+
+####     END BACKENDS     ####
+
+#---------------------------------------------------------------#
+
+####     DEPENDENCY     ####
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_CLIENT_IP_HEADER:
+        forwarded = request.headers.get(RATE_LIMIT_CLIENT_IP_HEADER)
+        if forwarded:
+            return forwarded.strip()
+    return request.client.host if request.client else "unknown"
+
+def token_user_id(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token).get("user_id")
+    except JWTError:
+        return None
+
+def rate_limit(policy_name: str, per_user: bool = False):
+    """Route dependency enforcing one policy. per_user buckets signed-in clients
+    by their user id, so users behind one NAT don't share a bucket; everyone
+    else is bucketed by IP."""
+    policy = POLICIES[policy_name]
+
+    async def check_rate_limit(request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+        user_id = token_user_id(request) if per_user else None
+        identity = f"user:{user_id}" if user_id else f"ip:{client_ip(request)}"
+        retry_after = await get_rate_limit_backend().acquire(f"{policy.name}:{identity}", policy)
+        if retry_after > 0:
+            rate_limited.inc((policy.name,))
+            raise RateLimited(max(1, math.ceil(retry_after)))
+    return check_rate_limit
+
+####     END DEPENDENCY     ####
@@ -0,0 +1,177 @@
+"""Revocation of issued JWTs (logout and refresh-token rotation).
+
+Every token carries a random jti. A revoked jti gets a row in revoked_tokens,
+kept until the token's own exp. Every worker also holds a Bloom filter of the
+revoked jti values. Authenticating a request only touches the database on a
+filter hit, and a filter has no false negatives, so the usual cost is a few
+in-memory hashes. A hit is confirmed against the table, which settles the
+rare false positive (REVOCATION_FILTER_ERROR_RATE).
+
+Workers keep their filters in step over LISTEN/NOTIFY on "token_revoked",
+through the process's shared listener (backend.src.notify). The notification
+goes out when the revoking transaction commits. Every REVOCATION_SYNC_SECONDS
+each worker also re-reads recent rows, which covers a dropped listener
+connection and PgBouncer in transaction mode, where LISTEN is not available. Every REVOCATION_PRUNE_SECONDS expired rows are deleted and the
+filter is rebuilt from the rest, since a Bloom filter can't forget entries.
+"""
+import asyncio
+import hashlib
+import math
+import time
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from backend.src.database import SessionLocal
+from backend.src.metrics import revocation_checks
+from backend.src.notify import listen
+from backend.src.auth.config import REVOCATION_FILTER_CAPACITY, REVOCATION_FILTER_ERROR_RATE, REVOCATION_SYNC_SECONDS, REVOCATION_PRUNE_SECONDS
+from backend.src.auth.models import Revoked_Tokens
+
+REVOCATION_CHANNEL = "token_revoked"
+# Re-read rows revoked this long before the last sync, so a transaction that
+# started before the sync but committed after it is not missed.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+#---------------------------------------------------------------#
+
+####     BLOOM FILTER     ####
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings. The k bit positions come from double hashing one blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        # Most lookups are misses and stop at the first clear bit.
+        bits = self.bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+def new_filter(expected: int = 0) -> BloomFilter:
+    # Grow past the configured capacity rather than let the false-positive rate climb.
+    return BloomFilter(max(REVOCATION_FILTER_CAPACITY, 2 * expected), REVOCATION_FILTER_ERROR_RATE)
+
+_filter = new_filter()
+_synced_until: Optional[datetime] = None
+
+####     END BLOOM FILTER     ####
+
+#---------------------------------------------------------------#
+
+####     REVOKE / CHECK     ####
+
+def expiry_of(payload: dict) -> datetime:
+    return datetime.fromtimestamp(payload["exp"], timezone.utc)
+
+async def revoke_tokens(db: AsyncSession, tokens: Dict[str, datetime]) -> set:
+    """Revoke jti -> expiry in the caller's transaction and return the jti values
+    this call revoked. A jti that was already revoked is left out. Refresh
+    rotation relies on this, so two requests can't both spend the same token."""
+    if not tokens:
+        return set()
+    revoked = (
+        insert(Revoked_Tokens)
+        .values([{"jti": jti, "expires_at": expires_at} for jti, expires_at in tokens.items()])
+        .on_conflict_do_nothing(index_elements=[Revoked_Tokens.jti])
+        .returning(Revoked_Tokens.jti)
+        .cte("revoked")
+    )
+    result = await db.execute(select(revoked.c.jti, func.pg_notify(REVOCATION_CHANNEL, revoked.c.jti)))
+    # Adding before the commit is safe: until then a hit just finds no row.
+    for jti in tokens:
+        _filter.add(jti)
+    return {row.jti for row in result}
+
+async def is_token_revoked(db: AsyncSession, jti: Optional[str]) -> bool:
+    # Tokens minted before jti existed can't be revoked; they run out at their exp.
+    if not jti or jti not in _filter:
+        revocation_checks.inc(("miss",))
+        return False
+    result = await db.execute(select(literal(1)).where(Revoked_Tokens.jti == jti))
+    revoked = result.first() is not None
+    revocation_checks.inc(("revoked" if revoked else "false_positive",))
+    return revoked
+
+####     END REVOKE / CHECK     ####
+
+#---------------------------------------------------------------#
+
+####     SYNC     ####
+
+def _on_notification(jti: str) -> None:
+    _filter.add(jti)
+
+listen(REVOCATION_CHANNEL, _on_notification)
+
+def _add_all(target: BloomFilter, jtis: Iterable[str]) -> None:
+    for jti in jtis:
+        target.add(jti)
+
+async def load_revoked_tokens(session_factory=SessionLocal) -> None:
+    """Rebuild this worker's filter from every unexpired revocation."""
+    global _filter, _synced_until
+    async with session_factory() as session:
+        watermark = (await session.execute(select(func.now()))).scalar_one()
+        result = await session.execute(select(Revoked_Tokens.jti).where(Revoked_Tokens.expires_at > watermark))
+        jtis = result.scalars().all()
+    rebuilt = new_filter(len(jtis))
+    _add_all(rebuilt, jtis)
+    _filter = rebuilt
+    _synced_until = watermark
+    # Notifications that reached the old filter during the rebuild are picked up again here.
+    await sync_revoked_tokens(session_factory)
+
+async def sync_revoked_tokens(session_factory=SessionLocal) -> None:
+    global _synced_until
+    async with session_factory() as session:
+        watermark = (await session.execute(select(func.now()))).scalar_one()
+        query = select(Revoked_Tokens.jti).where(Revoked_Tokens.expires_at > watermark)
+        if _synced_until is not None:
+            query = query.where(Revoked_Tokens.revoked_at > _synced_until - SYNC_OVERLAP)
+        result = await session.execute(query)
+        _add_all(_filter, result.scalars().all())
+    _synced_until = watermark
+
+async def prune_revoked_tokens(session_factory=SessionLocal) -> None:
+    async with session_factory() as session:
+        async with session.begin():
+            await session.execute(delete(Revoked_Tokens).where(Revoked_Tokens.expires_at <= func.now()))
+    await load_revoked_tokens(session_factory)
+
+async def run_revocation_sync(session_factory=SessionLocal) -> None:
+    next_prune = time.monotonic() + REVOCATION_PRUNE_SECONDS
+    while True:
+        try:
+            if time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + REVOCATION_PRUNE_SECONDS
+                await prune_revoked_tokens(session_factory)
+            else:
+                await sync_revoked_tokens(session_factory)
+        except Exception as e:
+            print("Revocation sync error: ", {e})
+        await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+
+####     END SYNC     ####
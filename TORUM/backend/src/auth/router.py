@@ -1,24 +1,86 @@
-import asyncio
-import uuid
 import re
+import uuid
+import orjson
 
-from fastapi import Depends, APIRouter, UploadFile, File, Query
-from fastapi.params import Form
+from datetime import datetime
+from fastapi import Depends, APIRouter, Query, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy.sql import text, func
+from sqlalchemy import delete
+from sqlalchemy.sql import func, or_, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Optional
 from jose import JWTError
 
-from backend.src.database import get_db
-from backend.src.auth.exceptions import UserExistedCheck, InvalidPassword, InvalidUser, PostNotFound, FileUploadFailed, FileDeletionFailed, DocumentNotFound, PresignedURLFailed, PermissionException, SizeTooLarge, EmptyQueryException, CredentialException
+from backend.src.database import SessionLocal, get_db, get_read_db
+from backend.src.auth.exceptions import UserExistedCheck, InvalidPassword, InvalidUser, PostNotFound, DocumentNotFound, PresignedURLFailed, PermissionException, EmptyQueryException, CredentialException, InvalidCursor
 from backend.src.auth.models import User, Post, Reading_Documents
-from backend.src.auth.schemas import UserCreate, UserUpdate, UserResponse, PostCreate, PostUpdate, Reading_Documents_Response
-from backend.src.auth.services import get_password_hash, verify_password, create_access_token, create_refresh_token, decode_token
-from backend.src.auth.dependencies import require_role
-from backend.src.auth.utils import upload_file_to_s3, delete_file_from_s3, generate_presigned_url
+from backend.src.auth.outbox import enqueue_s3_delete, upload_intent, wake_outbox_worker
+from backend.src.auth.extraction import wake_extraction_worker
+from backend.src.auth.schemas import UserCreate, UserUpdate, UserResponse, TokenResponse, RefreshTokenRequest, MessageResponse, PostCreate, PostUpdate, PostResponse, PostDetail, PostSummary, FeedEntry, Post_Ids_Request, PostsResponse, Reading_Documents_Response, Reading_Documents_Summary, Document_Ids_Request, Document_URL_Response, Document_URLs_Response, Batch_Delete_Response, SearchResponse, CacheStatsResponse
+from backend.src.auth.services import get_password_hash_async, verify_password_async, create_access_token, create_refresh_token, decode_token, token_claims
+from backend.src.auth.dependencies import oauth2_scheme, require_role, invalidate_principal, broadcast_principal_change
+from backend.src.auth.revocation import expiry_of, revoke_tokens
+from backend.src.auth.ratelimit import rate_limit
+from backend.src.auth.utils import get_presigned_url, get_s3_client, presigned_url_cache
+from backend.src.auth.uploads import stream_document_upload, UPLOAD_DOCUMENT_OPENAPI
+from backend.src.auth.conditional import NOT_MODIFIED_OPENAPI, strong_etag, validator_headers, has_validators, is_not_modified, not_modified
+from backend.src.auth.pagination import decode_cursor, encode_cursor, paginate
+from backend.src.auth.projections import POST_SUMMARY_COLUMNS, DOCUMENT_SUMMARY_COLUMNS, parse_fields, summary_columns, project
+from backend.src.auth.feed import FEED_COLUMNS, FEED_KEYS, feed_query, feed_snapshot
+from backend.src.auth.search import SEARCH_END, build_tsquery, count_matches, search_split, search_unified, search_cache, content_generation, content_cache_enabled, bump_content_generation, broadcast_content_change
+from backend.src.auth.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, SEARCH_TOTAL_COUNT_CAP, POST_SHARED_CACHE_SECONDS, PRESIGNED_URL_SAFETY_MARGIN_SECONDS
+
+#---------------------------------------------------------------#
+
+# Listing routes return a bare JSON array; the cursor of the next page, if any,
+# travels in this header so existing clients keep working unchanged.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+# Hot read routes select plain columns whose rows already have the shape of
+# their response_model. Rendering those straight to JSON with orjson skips
+# FastAPI's validate-then-encode pass, which costs more than the query on
+# list and search pages. The response_model stays for the OpenAPI schema.
+USER_COLUMNS = (User.user_id, User.username, User.email, User.user_role)
+POST_COLUMNS = (Post.post_id, Post.post_owner, Post.post_title, Post.post_content, Post.created_at, Post.updated_at)
+
+class RowsResponse(Response):
+    media_type = "application/json"
+
+    # asyncpg hands back its own UUID subclass, which orjson only encodes through default.
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+def rows_response(content, next_cursor: Optional[str] = None, headers: Optional[dict] = None) -> RowsResponse:
+    response = RowsResponse(content, headers=headers)
+    set_next_cursor(response, next_cursor)
+    return response
+
+def modifiable_by(current_user: UserResponse, owner_column):
+    """The update/delete rules of the single-item routes as one SQL condition, so a
+    batch route checks every id in a single query. Users may touch their own rows,
+    moderators also rows owned by plain users, admins anything. The query must join
+    User on owner_column."""
+    if current_user.user_role == "admin":
+        return true()
+    own = owner_column == current_user.user_id
+    if current_user.user_role == "moderator":
+        return or_(own, User.user_role == "user")
+    return own
+
+def sort_batch(requested_ids, rows) -> dict:
+    """Split requested ids by the (id, allowed) rows of a permission query."""
+    allowed = {row[0]: row[1] for row in rows}
+    requested_ids = list(dict.fromkeys(requested_ids))
+    return {
+        "permitted": [item_id for item_id in requested_ids if allowed.get(item_id)],
+        "not_found": [item_id for item_id in requested_ids if item_id not in allowed],
+        "forbidden": [item_id for item_id in requested_ids if allowed.get(item_id) is False],
+    }
 
 #---------------------------------------------------------------#
 
@@ -27,13 +89,13 @@ register_route = APIRouter(
     tags=["Register"]
 )
 
-@register_route.post('/register', response_model=UserResponse)
+@register_route.post('/register', response_model=UserResponse, dependencies=[Depends(rate_limit("register"))])
 async def register(user: UserCreate, 
                    db: AsyncSession = Depends(get_db)):
     existed_user = await db.execute(select(User).where((User.email == user.email)))
     if existed_user.scalar_one_or_none():
         raise UserExistedCheck()
-    hashed_pw = get_password_hash(user.password)
+    hashed_pw = await get_password_hash_async(user.password)
     new_user = User(
         username = user.username,
         email = user.email,
@@ -53,17 +115,18 @@ login_route = APIRouter(
     tags=["Login"]
 )
 
-@login_route.post('/login')
+@login_route.post('/login', response_model=TokenResponse, dependencies=[Depends(rate_limit("login"))])
 async def login(login_request: OAuth2PasswordRequestForm = Depends(), 
                 db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == login_request.username))
     user = result.scalar_one_or_none()
     if not user:
         raise InvalidUser()
-    if not verify_password(login_request.password, user.hashed_password):
+    if not await verify_password_async(login_request.password, user.hashed_password):
         raise InvalidPassword()
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email})
+    claims = token_claims(user)
+    access_token = create_access_token(data=claims)
+    refresh_token = create_refresh_token(data=claims)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -78,20 +141,33 @@ refresh_token_route = APIRouter(
     tags=["Refresh_Token"]
 )
 
-@refresh_token_route.post('/refresh')
-async def refresh_token(refresh_token: str):
+def decode_refresh_token(token: Optional[str]) -> dict:
+    if not token:
+        raise CredentialException()
     try:
-        payload = decode_token(refresh_token)
-        email: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        if not email or token_type != "refresh":
-            raise CredentialException()
+        payload = decode_token(token)
     except JWTError:
         raise CredentialException()
-    
-    access_token = create_access_token(data={"sub": email})
+    if not payload.get("sub") or payload.get("type") != "refresh":
+        raise CredentialException()
+    return payload
+
+@refresh_token_route.post('/refresh', response_model=TokenResponse)
+async def refresh_token(refresh_request: Optional[RefreshTokenRequest] = None,
+                        refresh_token: Optional[str] = Query(None, description="Deprecated; send the token in the body"),
+                        db: AsyncSession = Depends(get_db)):
+    payload = decode_refresh_token(refresh_request.refresh_token if refresh_request else refresh_token)
+    # Rotation: a refresh token is spent by its first use. Claiming it is the
+    # revocation insert itself, so a replayed or concurrently reused token loses.
+    if payload.get("jti"):
+        if not await revoke_tokens(db, {payload["jti"]: expiry_of(payload)}):
+            raise CredentialException()
+        await db.commit()
+
+    claims = {key: payload[key] for key in ("sub", "user_id", "user_role") if key in payload}
     return {
-        "access_token": access_token,
+        "access_token": create_access_token(data=claims),
+        "refresh_token": create_refresh_token(data=claims),
         "token_type": "bearer"
     }
 ####     END REFRESH TOKEN ROUTE     #####
@@ -103,8 +179,25 @@ logout_route = APIRouter(
     tags=["Logout"]
 )
 
-@logout_route.post('/logout')
-async def logout():
+@logout_route.post('/logout', response_model=MessageResponse)
+async def logout(logout_request: Optional[RefreshTokenRequest] = None,
+                 token: str = Depends(oauth2_scheme),
+                 db: AsyncSession = Depends(get_db)):
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        raise CredentialException()
+    revoked = {}
+    if payload.get("jti"):
+        revoked[payload["jti"]] = expiry_of(payload)
+    if logout_request is not None:
+        refresh_payload = decode_refresh_token(logout_request.refresh_token)
+        if refresh_payload.get("sub") != payload.get("sub"):
+            raise CredentialException()
+        if refresh_payload.get("jti"):
+            revoked[refresh_payload["jti"]] = expiry_of(refresh_payload)
+    await revoke_tokens(db, revoked)
+    await db.commit()
     return {"message": "Logout Successfully"}
 ####     END LOGOUT ROUTE     #####
 
@@ -115,20 +208,26 @@ get_user_route = APIRouter(
     tags=["Get_user"]
 )
 
-@get_user_route.get('/me')
+@get_user_route.get('/me', response_model=UserResponse)
 async def get_user(current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
     return current_user
 
 @get_user_route.get('/users', response_model=List[UserResponse])
-async def get_all_users(db: AsyncSession = Depends(get_db), 
+async def get_all_users(cursor: Optional[str] = Query(None),
+                        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+                        db: AsyncSession = Depends(get_read_db), 
                         current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
     if current_user.user_role != "admin":
         raise PermissionException()
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return users
-
-@get_user_route.put('/update-user')
+    query = select(*USER_COLUMNS).order_by(User.user_id).limit(limit + 1)
+    if cursor:
+        (after_id,) = decode_cursor("users", cursor)
+        query = query.where(User.user_id > uuid.UUID(after_id))
+    result = await db.execute(query)
+    users, next_cursor = paginate(result.mappings().all(), limit, "users", lambda user: [user["user_id"]])
+    return rows_response([dict(user) for user in users], next_cursor)
+
+@get_user_route.put('/update-user', response_model=UserResponse)
 async def update_user(update_request: UserUpdate,
                       db: AsyncSession = Depends(get_db),
                       current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
@@ -137,14 +236,21 @@ async def update_user(update_request: UserUpdate,
     update_data = update_request.model_dump(exclude_unset=True)
 
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
     for key, value in update_data.items():
         setattr(curr_user, key, value)
+    await broadcast_principal_change(db, curr_user.user_id)
+    if "username" in update_data:
+        # Feed entries carry the author's username.
+        await broadcast_content_change(db)
     await db.commit()
+    invalidate_principal(curr_user.user_id)
+    if "username" in update_data:
+        bump_content_generation()
     await db.refresh(curr_user)
     return curr_user
 
-@get_user_route.put('/update-user-role/{user_id}')
+@get_user_route.put('/update-user-role/{user_id}', response_model=UserResponse)
 async def update_user_role(user_id: str, 
                            new_role: str, 
                            db: AsyncSession = Depends(get_db), 
@@ -156,7 +262,11 @@ async def update_user_role(user_id: str,
     if user is None:
         raise InvalidUser()
     user.user_role = new_role
+    await broadcast_principal_change(db, user.user_id)
+    await broadcast_content_change(db)
     await db.commit()
+    invalidate_principal(user.user_id)
+    bump_content_generation()
     await db.refresh(user)
     return user
 ####     END USER ROUTE     #####
@@ -168,7 +278,7 @@ post_route = APIRouter(
     tags=["Posts"]
 )
 
-@post_route.post('/create-post')
+@post_route.post('/create-post', response_model=PostResponse)
 async def create_post(post: PostCreate, 
                       db: AsyncSession = Depends(get_db), 
                       current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
@@ -179,23 +289,44 @@ async def create_post(post: PostCreate,
     )
 
     db.add(new_post)
+    await broadcast_content_change(db)
     await db.commit()
+    bump_content_generation()
     await db.refresh(new_post)
     return new_post
 
-@post_route.get('/view-post/{id}')
+# A post's representation changes when the post is edited or its owner's role
+# changes, so those are what the validators are built from.
+POST_VERSION = func.coalesce(Post.updated_at, Post.created_at)
+
+def post_validators(post_id, version: datetime, owner_role: str) -> dict:
+    # Browsers revalidate every time (a cheap 304); nginx may share a copy for a few seconds.
+    return validator_headers(strong_etag(post_id, version.isoformat(), owner_role), version,
+                             f"public, max-age=0, s-maxage={POST_SHARED_CACHE_SECONDS}")
+
+@post_route.get('/view-post/{id}', response_model=PostDetail, responses=NOT_MODIFIED_OPENAPI)
 async def view_post(id: str, 
-                    db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Post, User.user_role).join(User, Post.post_owner == User.user_id).where(Post.post_id == id))
-    row = result.first()
+                    request: Request,
+                    db: AsyncSession = Depends(get_read_db)):
+    if has_validators(request):
+        result = await db.execute(
+            select(Post.post_id, POST_VERSION, User.user_role).join(User, Post.post_owner == User.user_id).where(Post.post_id == id)
+        )
+        row = result.first()
+        if row is None:
+            raise PostNotFound()
+        headers = post_validators(*row)
+        if is_not_modified(request, headers["ETag"], row[1]):
+            return not_modified(headers)
+    result = await db.execute(
+        select(*POST_COLUMNS, User.user_role.label("owner_role")).join(User, Post.post_owner == User.user_id).where(Post.post_id == id)
+    )
+    row = result.mappings().first()
     if row is None:
         raise PostNotFound()
-    post, owner_role = row
-    post_data = jsonable_encoder(post)
-    post_data["owner_role"] = owner_role
-    return post_data
+    return rows_response(dict(row), headers=post_validators(row["post_id"], row["updated_at"] or row["created_at"], row["owner_role"]))
 
-@post_route.put('/update-post/{id}')
+@post_route.put('/update-post/{id}', response_model=PostResponse)
 async def update_post(id: str, 
                       update_request: PostUpdate, 
                       db: AsyncSession = Depends(get_db), 
@@ -213,11 +344,13 @@ async def update_post(id: str,
     for key, value in update_data.items():
         if hasattr(post, key):
             setattr(post, key, value)
+    await broadcast_content_change(db)
     await db.commit()
+    bump_content_generation()
     await db.refresh(post)
     return post
 
-@post_route.delete('/delete-post/{id}')
+@post_route.delete('/delete-post/{id}', response_model=MessageResponse)
 async def delete_post(id: str, 
                       db: AsyncSession = Depends(get_db), 
                       current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
@@ -233,15 +366,80 @@ async def delete_post(id: str,
     if current_user.user_role == "moderator" and post.post_owner != current_user.user_id and owner_role != "user":
         raise PermissionException()
     await db.delete(post)
+    await broadcast_content_change(db)
     await db.commit()
+    bump_content_generation()
     return {"message": "Post deleted successfully !"}
 
-@post_route.get('/my-posts')
-async def get_my_posts(db: AsyncSession = Depends(get_db),
+@post_route.get('/feed', response_model=List[FeedEntry], response_model_exclude_unset=True)
+async def get_feed(cursor: Optional[str] = Query(None),
+                   limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+                   fields: Optional[str] = Query(None, description="Comma-separated subset of FeedEntry fields"),
+                   db: AsyncSession = Depends(get_read_db)):
+    output_fields = parse_fields(fields, FeedEntry)
+    if cursor:
+        query = feed_query(summary_columns(FEED_COLUMNS, output_fields, FEED_KEYS), limit, decode_cursor("feed", cursor))
+        rows = (await db.execute(query)).mappings().all()
+    else:
+        rows = (await feed_snapshot.rows())[:limit + 1]
+    posts, next_cursor = paginate(rows, limit, "feed", lambda post: [post["created_at"], post["post_id"]])
+    return rows_response([project(post, output_fields) for post in posts], next_cursor)
+
+@post_route.post('/view-posts', response_model=PostsResponse)
+async def view_posts(request: Post_Ids_Request,
+                     db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(
+        select(*POST_COLUMNS, User.user_role.label("owner_role")).join(User, Post.post_owner == User.user_id).where(Post.post_id.in_(request.post_ids))
+    )
+    found = {row["post_id"]: dict(row) for row in result.mappings()}
+    requested_ids = list(dict.fromkeys(request.post_ids))
+    return rows_response({
+        "posts": [found[post_id] for post_id in requested_ids if post_id in found],
+        "not_found": [post_id for post_id in requested_ids if post_id not in found],
+    })
+
+@post_route.post('/delete-posts', response_model=Batch_Delete_Response)
+async def delete_posts(request: Post_Ids_Request,
+                       db: AsyncSession = Depends(get_db),
+                       current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
+    result = await db.execute(
+        select(Post.post_id, modifiable_by(current_user, Post.post_owner).label("allowed"))
+        .join(User, Post.post_owner == User.user_id).where(Post.post_id.in_(request.post_ids))
+    )
+    batch = sort_batch(request.post_ids, result.all())
+    deleted = set()
+    if batch["permitted"]:
+        result = await db.execute(
+            delete(Post).where(Post.post_id.in_(batch["permitted"])).returning(Post.post_id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = set(result.scalars().all())
+        await broadcast_content_change(db)
+        await db.commit()
+        bump_content_generation()
+    # A post deleted by someone else between the check and the delete counts as not found.
+    return {
+        "deleted": [post_id for post_id in batch["permitted"] if post_id in deleted],
+        "not_found": batch["not_found"] + [post_id for post_id in batch["permitted"] if post_id not in deleted],
+        "forbidden": batch["forbidden"],
+    }
+
+@post_route.get('/my-posts', response_model=List[PostSummary], response_model_exclude_unset=True)
+async def get_my_posts(cursor: Optional[str] = Query(None),
+                       limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+                       fields: Optional[str] = Query(None, description="Comma-separated subset of PostSummary fields"),
+                       db: AsyncSession = Depends(get_read_db),
                        current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
-    result = await db.execute(select(Post).where(Post.post_owner == current_user.user_id))
-    posts = result.scalars().all()
-    return posts
+    output_fields = parse_fields(fields, PostSummary)
+    query = select(*summary_columns(POST_SUMMARY_COLUMNS, output_fields, ["created_at", "post_id"])
+                   ).where(Post.post_owner == current_user.user_id
+                   ).order_by(Post.created_at.desc(), Post.post_id.desc()).limit(limit + 1)
+    if cursor:
+        after_created_at, after_id = decode_cursor("my-posts", cursor)
+        query = query.where(tuple_(Post.created_at, Post.post_id) < tuple_(datetime.fromisoformat(after_created_at), uuid.UUID(after_id)))
+    result = await db.execute(query)
+    posts, next_cursor = paginate(result.mappings().all(), limit, "my-posts", lambda post: [post["created_at"], post["post_id"]])
+    return rows_response([project(post, output_fields) for post in posts], next_cursor)
 ####     END POST ROUTE     ####
 
 #---------------------------------------------------------------#
@@ -251,60 +449,109 @@ reading_documents_route = APIRouter(
     tags=["Reading_Documents"]
 )
 
-@reading_documents_route.post('/upload-reading-documents', response_model=Reading_Documents_Response)
-async def upload_reading_documents(docs_title: str = Form(...), 
-                                   docs_description: str = Form(...), 
-                                   docs_tags: str = Form(...),
-                                   file: UploadFile = File(...),
+@reading_documents_route.post('/upload-reading-documents', response_model=Reading_Documents_Response, openapi_extra=UPLOAD_DOCUMENT_OPENAPI,
+                              dependencies=[Depends(rate_limit("upload", per_user=True))])
+async def upload_reading_documents(request: Request,
                                    db: AsyncSession = Depends(get_db), 
+                                   s3 = Depends(get_s3_client),
                                    current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
-    MAX_FILE_SIZE = 20 * 1024 * 1024
-    if file.size > MAX_FILE_SIZE:
-        raise SizeTooLarge()
-    
-    s3_key = f"{current_user.user_id}/{uuid.uuid4()}_{file.filename}"
-    try:
-        upload_result = await upload_file_to_s3(file.file, s3_key, file.content_type)
-        if upload_result is None:
-            raise FileUploadFailed()
-    finally:
-        await file.close()
+    intent = None
+
+    async def record_upload_intent(s3_key: str) -> None:
+        # Committed before any bytes reach S3, so the object gets cleaned up if we never get to insert the row.
+        nonlocal intent
+        intent = upload_intent(s3_key)
+        db.add(intent)
+        await db.commit()
+
+    fields, s3_key = await stream_document_upload(request, s3, str(current_user.user_id),
+                                                  ["docs_title", "docs_description", "docs_tags"],
+                                                  on_key=record_upload_intent)
 
     new_doc = Reading_Documents(
         docs_owner = current_user.user_id,
-        docs_title = docs_title,
-        docs_description = docs_description,
-        docs_tags = docs_tags,
+        docs_title = fields["docs_title"],
+        docs_description = fields["docs_description"],
+        docs_tags = fields["docs_tags"],
         docs_file_path = s3_key,
     )
     db.add(new_doc)
+    await db.delete(intent)
+    await broadcast_content_change(db)
     await db.commit()
+    bump_content_generation()
+    wake_extraction_worker()
     await db.refresh(new_doc)
     return new_doc
 
-@reading_documents_route.get('/download-document/{doc_id}')
+@reading_documents_route.get('/download-document/{doc_id}', response_model=Document_URL_Response, responses=NOT_MODIFIED_OPENAPI)
 async def download_document(doc_id: str, 
-                            db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Reading_Documents).where(Reading_Documents.docs_id == doc_id))
-    document = result.scalar_one_or_none()
+                            request: Request,
+                            db: AsyncSession = Depends(get_read_db),
+                            s3 = Depends(get_s3_client)):
+    result = await db.execute(select(Reading_Documents.docs_file_path).where(Reading_Documents.docs_id == doc_id))
+    docs_file_path = result.scalar_one_or_none()
 
-    if document is None:
+    if docs_file_path is None:
         raise DocumentNotFound()
     
-    presigned_url = await generate_presigned_url(document.docs_file_path)
+    presigned_url = await get_presigned_url(s3, docs_file_path)
     if presigned_url is None:
         raise PresignedURLFailed()
-    
-    return {"url": presigned_url}
 
-@reading_documents_route.get('/my-reading-documents')
-async def get_my_documents(db: AsyncSession = Depends(get_db), 
+    # The body is a signed URL that expires, not the row, so the URL itself is
+    # the validator. No Last-Modified: a date match must never revive an expired URL.
+    # A URL from the presigned cache is valid for at least the safety margin.
+    headers = validator_headers(strong_etag(presigned_url), cache_control=f"private, max-age={PRESIGNED_URL_SAFETY_MARGIN_SECONDS}")
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified(headers)
+    return rows_response({"url": presigned_url}, headers=headers)
+
+@reading_documents_route.post('/download-documents', response_model=Document_URLs_Response)
+async def download_documents(request: Document_Ids_Request,
+                             db: AsyncSession = Depends(get_read_db),
+                             s3 = Depends(get_s3_client)):
+    result = await db.execute(
+        select(Reading_Documents.docs_id, Reading_Documents.docs_file_path).where(Reading_Documents.docs_id.in_(request.docs_ids))
+    )
+    urls = {}
+    for docs_id, docs_file_path in result.all():
+        presigned_url = await get_presigned_url(s3, docs_file_path)
+        if presigned_url is None:
+            raise PresignedURLFailed()
+        urls[docs_id] = presigned_url
+    not_found = [docs_id for docs_id in dict.fromkeys(request.docs_ids) if docs_id not in urls]
+    return {"urls": urls, "not_found": not_found}
+
+@reading_documents_route.get('/my-reading-documents', response_model=List[Reading_Documents_Summary], response_model_exclude_unset=True)
+async def get_my_documents(cursor: Optional[str] = Query(None),
+                           limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+                           include_urls: bool = Query(False),
+                           fields: Optional[str] = Query(None, description="Comma-separated subset of Reading_Documents_Summary fields"),
+                           db: AsyncSession = Depends(get_read_db), 
                            current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
-    result = await db.execute(select(Reading_Documents).where(Reading_Documents.docs_owner == current_user.user_id))
-    docs = result.scalars().all()
-    return docs
-
-@reading_documents_route.delete('/delete-reading-document/{doc_id}')
+    output_fields = parse_fields(fields, Reading_Documents_Summary)
+    if not include_urls and "url" in output_fields:
+        output_fields.remove("url")
+    query = select(*summary_columns(DOCUMENT_SUMMARY_COLUMNS, output_fields, ["uploaded_at", "docs_id", "docs_file_path"])
+                   ).where(Reading_Documents.docs_owner == current_user.user_id
+                   ).order_by(Reading_Documents.uploaded_at.desc(), Reading_Documents.docs_id.desc()).limit(limit + 1)
+    if cursor:
+        after_uploaded_at, after_id = decode_cursor("my-reading-documents", cursor)
+        query = query.where(tuple_(Reading_Documents.uploaded_at, Reading_Documents.docs_id) < tuple_(datetime.fromisoformat(after_uploaded_at), uuid.UUID(after_id)))
+    result = await db.execute(query)
+    docs, next_cursor = paginate(result.mappings().all(), limit, "my-reading-documents", lambda doc: [doc["uploaded_at"], doc["docs_id"]])
+    # Only presigning needs S3; a plain listing keeps working while it is down.
+    s3 = await get_s3_client() if include_urls else None
+    summaries = []
+    for doc in docs:
+        summary = project(doc, output_fields)
+        if include_urls:
+            summary["url"] = await get_presigned_url(s3, doc["docs_file_path"])
+        summaries.append(summary)
+    return rows_response(summaries, next_cursor)
+
+@reading_documents_route.delete('/delete-reading-document/{doc_id}', response_model=MessageResponse)
 async def delete_document(doc_id: str, 
                           db: AsyncSession = Depends(get_db), 
                           current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
@@ -319,13 +566,47 @@ async def delete_document(doc_id: str,
         raise PermissionException()
     if current_user.user_role == "moderator" and document.docs_owner != current_user.user_id and owner_role != "user":
         raise PermissionException()
-    deleted = await delete_file_from_s3(document.docs_file_path)
-    if not deleted:
-        raise FileDeletionFailed()
     await db.delete(document)
+    enqueue_s3_delete(db, document.docs_file_path)
+    await broadcast_content_change(db)
     await db.commit()
+    presigned_url_cache.pop(document.docs_file_path)
+    bump_content_generation()
+    wake_outbox_worker()
 
     return {"message": "Document deleted successfully !"}
+
+@reading_documents_route.post('/delete-reading-documents', response_model=Batch_Delete_Response)
+async def delete_documents(request: Document_Ids_Request,
+                           db: AsyncSession = Depends(get_db),
+                           current_user: UserResponse = Depends(require_role(["user", "moderator", "admin"]))):
+    result = await db.execute(
+        select(Reading_Documents.docs_id, modifiable_by(current_user, Reading_Documents.docs_owner).label("allowed"))
+        .join(User, Reading_Documents.docs_owner == User.user_id).where(Reading_Documents.docs_id.in_(request.docs_ids))
+    )
+    batch = sort_batch(request.docs_ids, result.all())
+    deleted = {}
+    if batch["permitted"]:
+        result = await db.execute(
+            delete(Reading_Documents).where(Reading_Documents.docs_id.in_(batch["permitted"]))
+            .returning(Reading_Documents.docs_id, Reading_Documents.docs_file_path)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = dict(result.all())
+        # One outbox row per object; the worker removes them with batched delete_objects calls.
+        for docs_file_path in deleted.values():
+            enqueue_s3_delete(db, docs_file_path)
+        await broadcast_content_change(db)
+        await db.commit()
+        for docs_file_path in deleted.values():
+            presigned_url_cache.pop(docs_file_path)
+        bump_content_generation()
+        wake_outbox_worker()
+    return {
+        "deleted": [docs_id for docs_id in batch["permitted"] if docs_id in deleted],
+        "not_found": batch["not_found"] + [docs_id for docs_id in batch["permitted"] if docs_id not in deleted],
+        "forbidden": batch["forbidden"],
+    }
 ####     READING DOCUMENTS ROUTE     ####
 
 #---------------------------------------------------------------#
@@ -336,35 +617,76 @@ search_route = APIRouter(
     tags = ["Search"]
 )
 
-@search_route.get("/search")
+@search_route.get("/search", response_model=SearchResponse, response_model_exclude_unset=True,
+                  dependencies=[Depends(rate_limit("search", per_user=True))])
 async def search(query: str = Query(..., min_length=1, max_length=100),
-                 offset: int = Query(0, ge=0),
+                 cursor: Optional[str] = Query(None),
                  limit: int = Query(10, ge=1, le=100),
+                 mode: str = Query("split", pattern="^(split|unified)$"),
+                 parallel: bool = Query(False),
+                 include_total: bool = Query(False),
+                 post_fields: Optional[str] = Query(None, description="Comma-separated subset of PostSummary fields"),
+                 document_fields: Optional[str] = Query(None, description="Comma-separated subset of Reading_Documents_Summary fields"),
                  db: AsyncSession = Depends(get_db)):
     if not query.strip():
         raise EmptyQueryException()
-    terms = re.findall(r"\w+", query)
+    terms = [term.lower() for term in re.findall(r"\w+", query)]
     if not terms:
         raise EmptyQueryException()
-    tsquery_string = " & ".join(f"{term}:*" for term in terms)
-    tsquery = func.to_tsquery('english', tsquery_string)
-
-    post_query = select(Post, func.ts_rank(Post.search_vector, tsquery).label('rank')
-                        ).where(Post.search_vector.op('@@')(tsquery)
-                        ).order_by(text('rank DESC')).offset(offset).limit(limit)
-    
-    document_query = select(Reading_Documents, func.ts_rank(Reading_Documents.search_vector, tsquery).label('rank')
-                            ).where(Reading_Documents.search_vector.op('@@')(tsquery)
-                            ).order_by(text('rank DESC')).offset(offset).limit(limit)
-    
-    post_result, document_result = await asyncio.gather(
-        db.execute(post_query),
-        db.execute(document_query)
-    )
-    
-    return {
-        "post_result": post_result.scalars().all(),
-        "document_result": document_result.scalars().all()
-    }
+    post_output_fields = parse_fields(post_fields, PostSummary)
+    document_output_fields = [name for name in parse_fields(document_fields, Reading_Documents_Summary) if name != "url"]
+    cache_key = (content_generation(), mode, tuple(terms), cursor, limit, include_total,
+                 tuple(post_output_fields), tuple(document_output_fields))
+    use_cache = content_cache_enabled()
+    cached = search_cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        return Response(cached, media_type="application/json")
+    # Misses read the primary: the page is cached under the current generation
+    # and shared by every client, so it must not come from a replica that hasn't
+    # replayed the write that bumped the generation yet.
+    tsquery = build_tsquery(terms)
+    # Cursors are bound to the normalized terms and the mode they were issued for.
+    cursor_kind = f"search-{mode}"
+    state = {"terms": terms}
+    if cursor:
+        state = decode_cursor(cursor_kind, cursor)
+        if state["terms"] != terms:
+            raise InvalidCursor()
+
+    if mode == "unified":
+        results, state["after"] = await search_unified(db, tsquery, state.get("after"), limit)
+        response = {
+            "results": results,
+            "next_cursor": encode_cursor(cursor_kind, state) if state["after"] is not None else None
+        }
+    else:
+        positions = state.get("positions", {"posts": None, "documents": None})
+        posts, documents, state["positions"] = await search_split(db, tsquery, positions, limit,
+                                                                  post_output_fields, document_output_fields,
+                                                                  SessionLocal if parallel else None)
+        exhausted = all(position == SEARCH_END for position in state["positions"].values())
+        response = {
+            "post_result": posts,
+            "document_result": documents,
+            "next_cursor": None if exhausted else encode_cursor(cursor_kind, state)
+        }
+
+    if include_total:
+        post_total = await count_matches(db, Post, tsquery)
+        document_total = await count_matches(db, Reading_Documents, tsquery)
+        response["total"] = {
+            "posts": min(post_total, SEARCH_TOTAL_COUNT_CAP),
+            "documents": min(document_total, SEARCH_TOTAL_COUNT_CAP),
+            "capped": post_total > SEARCH_TOTAL_COUNT_CAP or document_total > SEARCH_TOTAL_COUNT_CAP
+        }
+    # Cache the rendered body, so a hit is served without encoding anything again.
+    response = rows_response(response)
+    if use_cache:
+        search_cache.set(cache_key, response.body)
+    return response
+
+@search_route.get("/search/cache-stats", response_model=CacheStatsResponse)
+async def search_cache_stats(current_user: UserResponse = Depends(require_role(["admin"]))):
+    return {"generation": content_generation(), **search_cache.stats()}
 
 ####     END SEARCH ROUTE     ####
\ No newline at end of file
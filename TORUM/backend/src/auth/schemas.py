@@ -1,7 +1,7 @@
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, EmailStr
+from typing import Optional, List, Dict
+from pydantic import BaseModel, EmailStr, Field
 
 
 
@@ -23,6 +23,17 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class TokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class MessageResponse(BaseModel):
+    message: str
+
 class PostCreate(BaseModel):
     post_title: str
     post_content: str
@@ -31,6 +42,20 @@ class PostUpdate(BaseModel):
     post_title: Optional[str] = None
     post_content: Optional[str] = None
 
+class PostResponse(BaseModel):
+    post_id: UUID
+    post_owner: UUID
+    post_title: str
+    post_content: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class PostDetail(PostResponse):
+    owner_role: str
+
 class Reading_Documents_Response(BaseModel):
     docs_id: UUID
     docs_owner: UUID
@@ -39,6 +64,86 @@ class Reading_Documents_Response(BaseModel):
     docs_tags: str
     docs_file_path: str
     uploaded_at: datetime
+    extraction_status: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# List/search summaries. Every field is optional because ?fields= may ask for
+# any subset of them; unset fields are left out of the response.
+class PostSummary(BaseModel):
+    post_id: Optional[UUID] = None
+    post_owner: Optional[UUID] = None
+    post_title: Optional[str] = None
+    excerpt: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class FeedEntry(PostSummary):
+    author_username: Optional[str] = None
+    author_role: Optional[str] = None
+
+class Reading_Documents_Summary(BaseModel):
+    docs_id: Optional[UUID] = None
+    docs_owner: Optional[UUID] = None
+    docs_title: Optional[str] = None
+    docs_description: Optional[str] = None
+    docs_tags: Optional[str] = None
+    docs_file_path: Optional[str] = None
+    uploaded_at: Optional[datetime] = None
+    extraction_status: Optional[str] = None
+    url: Optional[str] = None
+
+class Post_Ids_Request(BaseModel):
+    post_ids: List[UUID] = Field(..., min_length=1, max_length=100)
+
+class PostsResponse(BaseModel):
+    posts: List[PostDetail]
+    not_found: List[UUID]
+
+class Document_Ids_Request(BaseModel):
+    docs_ids: List[UUID] = Field(..., min_length=1, max_length=100)
+
+class Document_URL_Response(BaseModel):
+    url: str
+
+class Document_URLs_Response(BaseModel):
+    urls: Dict[UUID, str]
+    not_found: List[UUID]
+
+# Every requested id lands in exactly one of the three lists.
+class Batch_Delete_Response(BaseModel):
+    deleted: List[UUID]
+    not_found: List[UUID]
+    forbidden: List[UUID]
+
+class SearchHit(BaseModel):
+    result_type: str
+    id: UUID
+    title: str
+    excerpt: Optional[str] = None
+    owner: UUID
+    created_at: datetime
+    rank: float
+
+class SearchTotal(BaseModel):
+    posts: int
+    documents: int
+    capped: bool
+
+# Split mode fills post_result/document_result, unified mode fills results;
+# total is only present with ?include_total=true.
+class SearchResponse(BaseModel):
+    post_result: Optional[List[PostSummary]] = None
+    document_result: Optional[List[Reading_Documents_Summary]] = None
+    results: Optional[List[SearchHit]] = None
+    next_cursor: Optional[str] = None
+    total: Optional[SearchTotal] = None
+
+class CacheStatsResponse(BaseModel):
+    generation: int
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
@@ -0,0 +1,140 @@
+import asyncio
+import uuid
+
+from sqlalchemy import String, literal, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from backend.src.cache import TTLCache
+from backend.src.metrics import register_cache
+from backend.src.notify import listen, is_listening
+from backend.src.auth.config import API_WORKERS, EXTRACTION_IN_PROCESS, SEARCH_TOTAL_COUNT_CAP, SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL_SECONDS, SEARCH_RANK_NORMALIZATION, SUMMARY_EXCERPT_LENGTH
+from backend.src.auth.models import Post, Reading_Documents
+from backend.src.auth.projections import POST_SUMMARY_COLUMNS, DOCUMENT_SUMMARY_COLUMNS, summary_columns, project
+
+# A split-mode cursor keeps one keyset position per result type: None before
+# the first page, [rank, id] of the last row returned, or "end" once exhausted.
+SEARCH_END = "end"
+
+# Rendered search pages keyed by (content generation, mode, terms, cursor, ...).
+# Every post/document write bumps the generation, so pages computed before it
+# can never match again and simply age out of the LRU. Each process has its own
+# generation, so writers also broadcast on CONTENT_CHANNEL and every listening
+# worker bumps its own; after a listener reconnect, when notifications may have
+# been missed, the generation is bumped once to drop everything.
+CONTENT_CHANNEL = "content_changed"
+
+search_cache = TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL_SECONDS)
+register_cache("search", search_cache)
+_content_generation = 0
+
+def content_generation() -> int:
+    return _content_generation
+
+def bump_content_generation() -> None:
+    global _content_generation
+    _content_generation += 1
+
+def _on_content_changed(payload: str) -> None:
+    bump_content_generation()
+
+listen(CONTENT_CHANNEL, _on_content_changed, on_connect=bump_content_generation)
+
+def content_cache_enabled() -> bool:
+    """Content caches are only safe while this worker hears every write: either
+    it is listening, or it is the only API worker and runs extraction itself."""
+    return is_listening() or (API_WORKERS <= 1 and EXTRACTION_IN_PROCESS)
+
+async def broadcast_content_change(db: AsyncSession) -> None:
+    """Queue a generation bump in the caller's transaction; it reaches every worker
+    when that commits. The writer still bumps its own generation after the commit,
+    so its next read can't hit a page cached before the write."""
+    await db.execute(select(func.pg_notify(CONTENT_CHANNEL, "")))
+
+def build_tsquery(terms):
+    return func.to_tsquery('english', " & ".join(f"{term}:*" for term in terms))
+
+def rank_expression(search_vector, tsquery):
+    # Cover density over the weighted vector: matches in the title (A) count
+    # most, and terms found close together beat terms scattered through a body.
+    return func.ts_rank_cd(search_vector, tsquery, SEARCH_RANK_NORMALIZATION)
+
+# (entity, summary columns, id column) for each result type of split search.
+POST_SEARCH = (Post, POST_SUMMARY_COLUMNS, Post.post_id)
+DOCUMENT_SEARCH = (Reading_Documents, DOCUMENT_SUMMARY_COLUMNS, Reading_Documents.docs_id)
+
+async def search_ranked(db: AsyncSession, target, tsquery, position, limit: int, output_fields):
+    if position == SEARCH_END:
+        return [], SEARCH_END
+    entity, columns, id_column = target
+    rank = rank_expression(entity.search_vector, tsquery)
+    query = select(*summary_columns(columns, output_fields, [id_column.key]), rank.label('rank')
+                   ).where(entity.search_vector.op('@@')(tsquery))
+    if position is not None:
+        after_rank, after_id = position
+        query = query.where(tuple_(rank, id_column) < tuple_(after_rank, uuid.UUID(after_id)))
+    result = await db.execute(query.order_by(rank.desc(), id_column.desc()).limit(limit + 1))
+    rows = result.mappings().all()
+    items = [project(row, output_fields) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return items, SEARCH_END
+    last = rows[limit - 1]
+    return items, [last["rank"], str(last[id_column.key])]
+
+async def _search_ranked_own_session(session_factory, target, tsquery, position, limit: int, output_fields):
+    async with session_factory() as session:
+        return await search_ranked(session, target, tsquery, position, limit, output_fields)
+
+async def search_split(db: AsyncSession, tsquery, positions: dict, limit: int, post_fields, document_fields,
+                       parallel_session_factory=None):
+    """Per-type pages. An AsyncSession runs one statement at a time, so when a
+    session factory is given each query checks out its own pooled connection
+    and the two run concurrently."""
+    if parallel_session_factory is not None:
+        (posts, post_position), (documents, document_position) = await asyncio.gather(
+            _search_ranked_own_session(parallel_session_factory, POST_SEARCH, tsquery, positions["posts"], limit, post_fields),
+            _search_ranked_own_session(parallel_session_factory, DOCUMENT_SEARCH, tsquery, positions["documents"], limit, document_fields),
+        )
+    else:
+        posts, post_position = await search_ranked(db, POST_SEARCH, tsquery, positions["posts"], limit, post_fields)
+        documents, document_position = await search_ranked(db, DOCUMENT_SEARCH, tsquery, positions["documents"], limit, document_fields)
+    return posts, documents, {"posts": post_position, "documents": document_position}
+
+def _unified_branch(result_type: str, id_column, title_column, excerpt_column, owner_column, created_column, search_vector, tsquery, after):
+    rank = rank_expression(search_vector, tsquery)
+    query = select(
+        literal(result_type, String).label('result_type'),
+        id_column.label('id'),
+        title_column.label('title'),
+        func.left(excerpt_column, SUMMARY_EXCERPT_LENGTH).label('excerpt'),
+        owner_column.label('owner'),
+        created_column.label('created_at'),
+        rank.label('rank'),
+    ).where(search_vector.op('@@')(tsquery))
+    if after is not None:
+        after_rank, after_id = after
+        query = query.where(tuple_(rank, id_column) < tuple_(after_rank, uuid.UUID(after_id)))
+    return query
+
+async def search_unified(db: AsyncSession, tsquery, after, limit: int):
+    """One globally ranked page over posts and documents in a single UNION ALL round trip."""
+    combined = union_all(
+        _unified_branch('post', Post.post_id, Post.post_title, Post.post_content, Post.post_owner,
+                        Post.created_at, Post.search_vector, tsquery, after),
+        _unified_branch('document', Reading_Documents.docs_id, Reading_Documents.docs_title, Reading_Documents.docs_description,
+                        Reading_Documents.docs_owner, Reading_Documents.uploaded_at, Reading_Documents.search_vector, tsquery, after),
+    ).subquery()
+    result = await db.execute(
+        select(combined).order_by(combined.c.rank.desc(), combined.c.id.desc()).limit(limit + 1)
+    )
+    rows = [dict(row._mapping) for row in result.all()]
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], [last["rank"], str(last["id"])]
+
+async def count_matches(db: AsyncSession, entity, tsquery) -> int:
+    matches = select(literal(1)).where(entity.search_vector.op('@@')(tsquery)).limit(SEARCH_TOTAL_COUNT_CAP + 1).subquery()
+    result = await db.execute(select(func.count()).select_from(matches))
+    return result.scalar_one()
@@ -1,8 +1,15 @@
+import asyncio
+import uuid
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 
-from backend.src.auth.config import JWT_ALGORITHM, JWT_EXPIRATION_MINUTES, JWT_SECRET_KEY, REFRESH_TOKEN_HOURS
+from backend.src.auth.config import JWT_ALGORITHM, JWT_EXPIRATION_MINUTES, JWT_SECRET_KEY, REFRESH_TOKEN_HOURS, PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+from backend.src.auth.exceptions import PasswordHashingBusy
+from backend.src.metrics import timed
 
 
 pwd_context = CryptContext(schemes="bcrypt", deprecated="auto")
@@ -17,18 +24,64 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 # End Password Hashing/Verification
 
 
+# Async Password Hashing Service
+# bcrypt holds the CPU for 100-300 ms per call, so request handlers run it on a
+# bounded pool. At most PASSWORD_HASH_WORKERS jobs run at once, up to
+# PASSWORD_HASH_MAX_QUEUE more wait for a slot, and anything beyond that is
+# rejected with 503 instead of piling up behind the pool.
+_hash_executor: Optional[Executor] = None
+_hash_jobs = 0
+
+def start_password_hasher() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        return
+    if PASSWORD_HASH_EXECUTOR == "process":
+        _hash_executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    else:
+        _hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+def stop_password_hasher() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+async def _run_hash_job(operation: str, func, *args):
+    global _hash_jobs
+    if _hash_jobs >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        raise PasswordHashingBusy()
+    start_password_hasher()
+    _hash_jobs += 1
+    try:
+        with timed("password_hash", operation):
+            return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_jobs -= 1
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash_job("hash", get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job("verify", verify_password, plain_password, hashed_password)
+# End Async Password Hashing Service
+
+
 # JWT Token
+def token_claims(user) -> dict:
+    return {"sub": user.email, "user_id": str(user.user_id), "user_role": user.user_role}
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=JWT_EXPIRATION_MINUTES)
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(hours=REFRESH_TOKEN_HOURS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
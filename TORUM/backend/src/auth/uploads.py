@@ -0,0 +1,168 @@
+import os
+import uuid
+
+from botocore.exceptions import ClientError
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from backend.src.auth.config import MAX_UPLOAD_SIZE_MB, S3_UPLOAD_PART_SIZE_MB, S3_UPLOAD_MAX_CONCURRENCY
+from backend.src.auth.exceptions import SizeTooLarge, InvalidFileType, InvalidUploadForm, FileUploadFailed
+from backend.src.auth.utils import MultipartS3Upload
+
+MAX_UPLOAD_SIZE = MAX_UPLOAD_SIZE_MB * 1024 * 1024
+# S3 rejects multipart parts smaller than 5 MiB (except the last one).
+UPLOAD_PART_SIZE = max(S3_UPLOAD_PART_SIZE_MB, 5) * 1024 * 1024
+MAX_FIELD_SIZE = 64 * 1024
+# Multipart framing (boundaries, part headers, small form fields) on top of the file itself.
+FORM_OVERHEAD = 1024 * 1024
+ALLOWED_EXTENSIONS = {'.pdf', '.docx'}
+
+# The upload route reads the raw body itself, so FastAPI can't infer its schema.
+UPLOAD_DOCUMENT_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["docs_title", "docs_description", "docs_tags", "file"],
+                    "properties": {
+                        "docs_title": {"type": "string"},
+                        "docs_description": {"type": "string"},
+                        "docs_tags": {"type": "string"},
+                        "file": {"type": "string", "format": "binary"},
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+class _FormEvents:
+    """Turns python-multipart's synchronous callbacks into a list of events
+    that the async side drains after every chunk it feeds the parser."""
+
+    def __init__(self):
+        self.events: List[Tuple[str, object]] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        self.events.append(("begin", self._headers))
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        self.events.append(("data", data[start:end]))
+
+    def on_part_end(self):
+        self.events.append(("end", None))
+
+
+async def stream_document_upload(request: Request, client, key_prefix: str, required_fields: List[str],
+                                 on_key: Optional[Callable[[str], Awaitable[None]]] = None) -> Tuple[Dict[str, str], str]:
+    """Stream a multipart/form-data document upload straight into S3.
+
+    The body is parsed chunk by chunk and the file part is forwarded to a
+    multipart S3 upload as it arrives, so nothing is spooled to disk and the
+    size limit is enforced mid-stream. Any failure, including the client
+    disconnecting, aborts the S3 upload. on_key, if given, is awaited with the
+    object's key before any of the file is sent. Returns the text fields and the S3 key.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise InvalidUploadForm("Expected a multipart/form-data body !")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_SIZE + FORM_OVERHEAD:
+        raise SizeTooLarge(MAX_UPLOAD_SIZE_MB)
+
+    form = _FormEvents()
+    parser = MultipartParser(boundary, form.callbacks())
+    fields: Dict[str, str] = {}
+    upload = None
+    field_name = None
+    field_value = bytearray()
+    in_file = False
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            events, form.events = form.events, []
+            for kind, payload in events:
+                if kind == "begin":
+                    _, disposition = parse_options_header(payload.get(b"content-disposition", b""))
+                    name = disposition.get(b"name", b"").decode()
+                    filename = disposition.get(b"filename")
+                    in_file = filename is not None
+                    if not in_file:
+                        field_name, field_value = name, bytearray()
+                        continue
+                    if name != "file" or upload is not None:
+                        raise InvalidUploadForm("Expected exactly one file field named 'file' !")
+                    filename = os.path.basename(filename.decode())
+                    if os.path.splitext(filename)[1].lower() not in ALLOWED_EXTENSIONS:
+                        raise InvalidFileType()
+                    s3_key = f"{key_prefix}/{uuid.uuid4()}_{filename}"
+                    if on_key is not None:
+                        await on_key(s3_key)
+                    upload = MultipartS3Upload(
+                        client,
+                        s3_key,
+                        payload.get(b"content-type", b"application/octet-stream").decode(),
+                        UPLOAD_PART_SIZE,
+                        S3_UPLOAD_MAX_CONCURRENCY,
+                    )
+                elif kind == "data":
+                    if in_file:
+                        if upload.size + len(payload) > MAX_UPLOAD_SIZE:
+                            raise SizeTooLarge(MAX_UPLOAD_SIZE_MB)
+                        await upload.write(payload)
+                    else:
+                        field_value += payload
+                        if len(field_value) > MAX_FIELD_SIZE:
+                            raise InvalidUploadForm(f"Form field '{field_name}' is too large !")
+                elif not in_file:
+                    fields[field_name] = field_value.decode("utf-8", errors="replace")
+        parser.finalize()
+
+        if upload is None:
+            raise InvalidUploadForm("Missing file !")
+        missing = [name for name in required_fields if name not in fields]
+        if missing:
+            raise InvalidUploadForm(f"Missing form fields: {', '.join(missing)} !")
+        s3_key = await upload.complete()
+    except ClientError as e:
+        await upload.abort()
+        print("Upload error: ", {e})
+        raise FileUploadFailed()
+    except BaseException:
+        if upload is not None:
+            await upload.abort()
+        raise
+    return fields, s3_key
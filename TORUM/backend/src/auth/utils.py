@@ -1,54 +1,187 @@
+import asyncio
+import math
+import time
+
+from aiobotocore.config import AioConfig
 from aiobotocore.session import get_session
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
+from contextlib import AsyncExitStack
 from typing import Optional
 
-from backend.src.auth.config import AWS_ACCESS_KEY, AWS_SECRET_ACCESS_KEY, AWS_REGION, S3_BUCKET
+from backend.src.cache import TTLCache
+from backend.src.metrics import register_cache, timed
+from backend.src.auth.exceptions import StorageUnavailable
+from backend.src.auth.config import AWS_ACCESS_KEY, AWS_SECRET_ACCESS_KEY, AWS_REGION, S3_BUCKET, S3_ENDPOINT_URL, S3_MAX_POOL_CONNECTIONS, S3_KEEPALIVE_SECONDS, S3_CONNECT_RETRY_BASE_SECONDS, S3_CONNECT_RETRY_MAX_SECONDS, PRESIGNED_URL_EXPIRES_SECONDS, PRESIGNED_URL_SAFETY_MARGIN_SECONDS, PRESIGNED_URL_CACHE_SIZE
+
+# One long-lived client per process: it keeps its connection pool and resolved
+# credentials, so requests don't pay for a new TLS handshake every call.
+# If it can't be started at boot, the first caller to need it tries again; the
+# lock keeps concurrent callers from each opening a client. After a failed
+# attempt, callers get StorageUnavailable (503) without touching S3 until an
+# exponentially growing backoff has passed.
+_s3_exit_stack: Optional[AsyncExitStack] = None
+_s3_client = None
+_s3_start_lock = asyncio.Lock()
+_s3_failures = 0
+_s3_retry_at = 0.0
+
+def _check_s3_backoff() -> None:
+    wait = _s3_retry_at - time.monotonic()
+    if wait > 0:
+        raise StorageUnavailable(math.ceil(wait))
+
+async def start_s3_client():
+    global _s3_failures, _s3_retry_at
+    if _s3_client is not None:
+        return _s3_client
+    _check_s3_backoff()
+    async with _s3_start_lock:
+        if _s3_client is not None:
+            return _s3_client
+        _check_s3_backoff()
+        try:
+            client = await _open_s3_client()
+        except (ClientError, BotoCoreError):
+            _s3_failures += 1
+            delay = min(S3_CONNECT_RETRY_MAX_SECONDS, S3_CONNECT_RETRY_BASE_SECONDS * 2 ** (_s3_failures - 1))
+            _s3_retry_at = time.monotonic() + delay
+            raise StorageUnavailable(math.ceil(delay))
+        _s3_failures = 0
+        return client
 
-async def upload_file_to_s3(file_obj, s3_key: str, content_type: str) -> Optional[str]:
-    session = get_session()
-    async with session.create_client(
+async def _open_s3_client():
+    global _s3_exit_stack, _s3_client
+    exit_stack = AsyncExitStack()
+    client = await exit_stack.enter_async_context(get_session().create_client(
         's3',
         region_name=AWS_REGION,
+        endpoint_url=S3_ENDPOINT_URL,
         aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-    ) as client:
-        try:
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        config=AioConfig(
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            connector_args={"keepalive_timeout": S3_KEEPALIVE_SECONDS},
+        )
+    ))
+    try:
+        with timed("s3", "head_bucket"):
             await client.head_bucket(Bucket=S3_BUCKET)
-            await client.put_object(
+    except (ClientError, BotoCoreError) as e:
+        print("S3 bucket check failed: ", {e})
+        await exit_stack.aclose()
+        raise
+    _s3_exit_stack, _s3_client = exit_stack, client
+    return client
+
+async def stop_s3_client() -> None:
+    global _s3_exit_stack, _s3_client
+    if _s3_exit_stack is not None:
+        await _s3_exit_stack.aclose()
+    _s3_exit_stack, _s3_client = None, None
+
+async def get_s3_client():
+    return await start_s3_client()
+
+class MultipartS3Upload:
+    """Feeds a stream of bytes into S3 multipart upload_part calls.
+
+    Data is buffered up to one part; at most max_in_flight parts are uploading
+    at once and write() waits for a free slot, so memory stays bounded by
+    roughly part_size * (max_in_flight + 1). Streams that never fill a part
+    are sent with a single put_object on complete().
+    """
+
+    def __init__(self, client, s3_key: str, content_type: str, part_size: int, max_in_flight: int):
+        self.client = client
+        self.s3_key = s3_key
+        self.content_type = content_type
+        self.part_size = part_size
+        self.size = 0
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._etags: dict = {}
+        self._tasks: list = []
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            await self._submit_part(part)
+
+    async def _submit_part(self, body: bytes) -> None:
+        if self._upload_id is None:
+            with timed("s3", "create_multipart_upload"):
+                response = await self.client.create_multipart_upload(
+                    Bucket=S3_BUCKET,
+                    Key=self.s3_key,
+                    ContentType=self.content_type
+                )
+            self._upload_id = response["UploadId"]
+        await self._slots.acquire()
+        self._raise_failed_part()
+        part_number = len(self._tasks) + 1
+        self._tasks.append(asyncio.create_task(self._upload_part(part_number, body)))
+
+    async def _upload_part(self, part_number: int, body: bytes) -> None:
+        try:
+            with timed("s3", "upload_part"):
+                response = await self.client.upload_part(
+                    Bucket=S3_BUCKET,
+                    Key=self.s3_key,
+                    UploadId=self._upload_id,
+                    PartNumber=part_number,
+                    Body=body
+                )
+            self._etags[part_number] = response["ETag"]
+        finally:
+            self._slots.release()
+
+    def _raise_failed_part(self) -> None:
+        for task in self._tasks:
+            if task.done() and task.exception() is not None:
+                raise task.exception()
+
+    async def complete(self) -> str:
+        if self._upload_id is None:
+            with timed("s3", "put_object"):
+                await self.client.put_object(
+                    Bucket=S3_BUCKET,
+                    Key=self.s3_key,
+                    Body=bytes(self._buffer),
+                    ContentType=self.content_type
+                )
+            return self.s3_key
+        if self._buffer:
+            await self._submit_part(bytes(self._buffer))
+            self._buffer.clear()
+        await asyncio.gather(*self._tasks)
+        with timed("s3", "complete_multipart_upload"):
+            await self.client.complete_multipart_upload(
                 Bucket=S3_BUCKET,
-                Key=s3_key,
-                Body=file_obj,
-                ContentType=content_type
+                Key=self.s3_key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": [{"ETag": self._etags[n], "PartNumber": n} for n in sorted(self._etags)]}
             )
-            return s3_key
-        except ClientError as e:
-            print("Upload error: ", {e})
-            return None
-
-async def delete_file_from_s3(s3_key: str) -> bool:
-    session = get_session()
-    async with session.create_client(
-        's3',
-        region_name=AWS_REGION,
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-    ) as client:
-        try:
-            await client.delete_object(Bucket=S3_BUCKET, Key=s3_key)
-            return True
-        except ClientError as e:
-            print("Delete failed: ", {e})
-            return False
-
-async def generate_presigned_url(filename: str, expires_in: int = 3600) -> Optional[str]:
-    session = get_session()
-    async with session.create_client(
-        's3',
-        region_name=AWS_REGION,
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-    ) as client:
-        try:
+        return self.s3_key
+
+    async def abort(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._buffer.clear()
+        if self._upload_id is not None:
+            try:
+                with timed("s3", "abort_multipart_upload"):
+                    await self.client.abort_multipart_upload(Bucket=S3_BUCKET, Key=self.s3_key, UploadId=self._upload_id)
+            except ClientError as e:
+                print("Abort multipart upload error: ", {e})
+
+async def generate_presigned_url(client, filename: str, expires_in: int = 3600) -> Optional[str]:
+    try:
+        with timed("s3", "generate_presigned_url"):
             url = await client.generate_presigned_url(
                 ClientMethod='get_object',
                 Params={
@@ -57,7 +190,21 @@ async def generate_presigned_url(filename: str, expires_in: int = 3600) -> Optio
                 },
                 ExpiresIn=expires_in
             )
-            return url
-        except ClientError as e:
-            print("Generate presigned URL error: ", {e})
-            return None
\ No newline at end of file
+        return url
+    except ClientError as e:
+        print("Generate presigned URL error: ", {e})
+        return None
+
+# Presigned URLs keyed by S3 key. An entry is dropped once less than
+# PRESIGNED_URL_SAFETY_MARGIN_SECONDS of the URL's validity is left, so a
+# cached URL handed to a client is always usable for at least that long.
+presigned_url_cache = TTLCache(PRESIGNED_URL_CACHE_SIZE, PRESIGNED_URL_EXPIRES_SECONDS - PRESIGNED_URL_SAFETY_MARGIN_SECONDS)
+register_cache("presigned_url", presigned_url_cache)
+
+async def get_presigned_url(client, s3_key: str) -> Optional[str]:
+    url = presigned_url_cache.get(s3_key)
+    if url is None:
+        url = await generate_presigned_url(client, s3_key, PRESIGNED_URL_EXPIRES_SECONDS)
+        if url is not None:
+            presigned_url_cache.set(s3_key, url)
+    return url
@@ -0,0 +1,209 @@
+"""Bulk import/export of users, posts and reading-document metadata.
+
+    python -m backend.src.bulk import users users.ndjson
+    python -m backend.src.bulk import posts posts.csv --batch-size 20000
+    python -m backend.src.bulk export reading_documents docs.ndjson
+
+Imports stream the file through asyncpg COPY one batch at a time, so memory
+stays constant whatever the row count. search_vector is a generated column,
+so Postgres computes it as rows are copied in. What remains expensive is
+maintaining the GIN search index row by row. With --defer-search-index the
+index is dropped for the load and rebuilt in one pass at the end, with CREATE
+INDEX CONCURRENTLY. Searches fall back to sequential scans while the index is
+missing, so only use it for large loads in a quiet window. Exports stream from
+the server: CSV through COPY TO, NDJSON through a server-side cursor.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+import uuid
+
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import asyncpg
+
+from backend.src.config import get_settings
+
+
+def _uuid(value) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+def _timestamp(value) -> datetime:
+    parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _text(value) -> str:
+    return str(value)
+
+
+class TableSpec:
+    """How one table is read from a file: column -> (parser, default factory or None when missing)."""
+
+    def __init__(self, name: str, primary_key: str, columns: Dict[str, Tuple[Callable, Optional[Callable]]],
+                 search_index: Optional[str] = None):
+        self.name = name
+        self.primary_key = primary_key
+        self.columns = columns
+        self.search_index = search_index
+
+    def record(self, row: dict) -> tuple:
+        values = []
+        for column, (parse, default) in self.columns.items():
+            value = row.get(column)
+            if value is None or value == "":
+                values.append(default() if default else None)
+            else:
+                values.append(parse(value))
+        return tuple(values)
+
+
+TABLES = {
+    "users": TableSpec("users", "user_id", {
+        "user_id": (_uuid, uuid.uuid4),
+        "username": (_text, None),
+        "email": (_text, None),
+        "hashed_password": (_text, None),
+        "user_role": (_text, lambda: "user"),
+    }),
+    "posts": TableSpec("posts", "post_id", {
+        "post_id": (_uuid, uuid.uuid4),
+        "post_owner": (_uuid, None),
+        "post_title": (_text, None),
+        "post_content": (_text, None),
+        "created_at": (_timestamp, lambda: datetime.now(timezone.utc)),
+        "updated_at": (_timestamp, None),
+    }, search_index="idx_post_search"),
+    "reading_documents": TableSpec("reading_documents", "docs_id", {
+        "docs_id": (_uuid, uuid.uuid4),
+        "docs_owner": (_uuid, None),
+        "docs_title": (_text, None),
+        "docs_description": (_text, None),
+        "docs_tags": (_text, lambda: "Documents"),
+        "docs_file_path": (_text, None),
+        "uploaded_at": (_timestamp, lambda: datetime.now(timezone.utc)),
+    }, search_index="idx_docs_search"),
+}
+
+
+def plain_dsn() -> str:
+    # asyncpg wants a plain postgresql:// URL, not SQLAlchemy's postgresql+asyncpg://
+    return get_settings().SQLALCHEMY_DATABASE_URL.replace("+asyncpg", "")
+
+def file_format(path: str, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+def read_rows(path: str, fmt: str) -> Iterator[dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def batches(records: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+#---------------------------------------------------------------#
+
+####     IMPORT     ####
+
+async def import_table(args) -> None:
+    spec = TABLES[args.table]
+    fmt = file_format(args.path, args.format)
+    connection = await asyncpg.connect(plain_dsn())
+    started = time.perf_counter()
+    loaded = 0
+    defer_index = args.defer_search_index and spec.search_index is not None
+    try:
+        if defer_index:
+            await connection.execute(f"DROP INDEX IF EXISTS {spec.search_index}")
+        try:
+            for batch in batches((spec.record(row) for row in read_rows(args.path, fmt)), args.batch_size):
+                await connection.copy_records_to_table(spec.name, records=batch, columns=list(spec.columns))
+                loaded += len(batch)
+                print(f"{spec.name}: {loaded} rows copied", file=sys.stderr)
+        finally:
+            if defer_index:
+                print(f"{spec.name}: rebuilding {spec.search_index}", file=sys.stderr)
+                await connection.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {spec.search_index} ON {spec.name} USING gin (search_vector)"
+                )
+        await connection.execute(f"ANALYZE {spec.name}")
+    finally:
+        await connection.close()
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"table": spec.name, "rows": loaded, "seconds": round(elapsed, 1),
+                      "rows_per_second": round(loaded / elapsed) if elapsed else loaded}))
+
+####     END IMPORT     ####
+
+#---------------------------------------------------------------#
+
+####     EXPORT     ####
+
+def _json_default(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Unserializable value: {value!r}")
+
+async def export_table(args) -> None:
+    spec = TABLES[args.table]
+    fmt = file_format(args.path, args.format)
+    columns = list(spec.columns)
+    connection = await asyncpg.connect(plain_dsn())
+    exported = 0
+    try:
+        if fmt == "csv":
+            result = await connection.copy_from_table(spec.name, columns=columns, output=args.path, format="csv", header=True)
+            exported = int(result.split()[-1])
+        else:
+            query = f"SELECT {', '.join(columns)} FROM {spec.name} ORDER BY {spec.primary_key}"
+            with open(args.path, "w", encoding="utf-8") as f:
+                async with connection.transaction(readonly=True):
+                    async for row in connection.cursor(query, prefetch=args.batch_size):
+                        f.write(json.dumps(dict(row), default=_json_default, ensure_ascii=False))
+                        f.write("\n")
+                        exported += 1
+    finally:
+        await connection.close()
+    print(json.dumps({"table": spec.name, "rows": exported, "path": args.path}))
+
+####     END EXPORT     ####
+
+#---------------------------------------------------------------#
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, handler in (("import", import_table), ("export", export_table)):
+        command = commands.add_parser(name)
+        command.add_argument("table", choices=list(TABLES))
+        command.add_argument("path")
+        command.add_argument("--format", choices=["ndjson", "csv"], help="defaults to the file extension")
+        command.add_argument("--batch-size", type=int, default=10000)
+        if name == "import":
+            command.add_argument("--defer-search-index", action="store_true",
+                                 help="drop the GIN search index during the load and rebuild it afterwards")
+        command.set_defaults(handler=handler)
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
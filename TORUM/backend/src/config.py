@@ -5,6 +5,12 @@ from functools import lru_cache
 from pathlib import Path
 
 class Settings(BaseSettings):
+    # Server processes. Pool, queue and cache sizes below marked "deployment
+    # total" are budgets for all workers together; each worker gets an equal share.
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8000
+    API_WORKERS: int = 1
+
     # PostgreSQL
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
@@ -13,23 +19,141 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     SQLALCHEMY_DATABASE_URL: str
 
+    # Database engine profile
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10                  # deployment total
+    DB_MAX_OVERFLOW: int = 10               # deployment total
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP_CONNECTIONS: int = 5     # deployment total
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    # Transaction-pooling PgBouncer can't keep prepared statements between transactions
+    DB_PGBOUNCER_MODE: bool = False
+    # Direct (or session-pooled) URL for the per-process LISTEN connection.
+    # Needed behind PgBouncer for cross-worker invalidation; defaults to the main URL.
+    DB_LISTEN_URL: Optional[str] = Field(default=None)
+
+    # Read replica (optional)
+    SQLALCHEMY_READ_REPLICA_URL: Optional[str] = Field(default=None)
+    READ_YOUR_WRITES_SECONDS: int = 5
+    REPLICA_MAX_LAG_SECONDS: float = 10
+    REPLICA_HEALTH_CHECK_SECONDS: float = 5
+
     # JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int
     REFRESH_TOKEN_HOURS: int
 
+    # Token revocation (logout, refresh-token rotation)
+    REVOCATION_FILTER_CAPACITY: int = 100000   # revoked, unexpired tokens the Bloom filter is sized for
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_SECONDS: float = 30        # catch-up poll behind LISTEN/NOTIFY (the only channel under PgBouncer without DB_LISTEN_URL)
+    REVOCATION_PRUNE_SECONDS: float = 3600     # drop expired revocations and rebuild the filter
+
+    # Password hashing
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4          # deployment total
+    PASSWORD_HASH_MAX_QUEUE: int = 64       # deployment total
+
+    # Pagination
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 100
+    SEARCH_TOTAL_COUNT_CAP: int = 1000
+
+    # List and search summaries
+    SUMMARY_EXCERPT_LENGTH: int = 200
+
+    # Search ranking: ts_rank_cd normalization bitmask (0 = ignore length,
+    # 1 = divide by 1 + log(length), 2 = divide by length, 32 = scale to 0..1)
+    SEARCH_RANK_NORMALIZATION: int = 1
+
+    # Search cache
+    SEARCH_CACHE_SIZE: int = 2000           # deployment total
+    SEARCH_CACHE_TTL_SECONDS: int = 300
+
+    # Feed: first page snapshot, rebuilt after post writes in this worker
+    FEED_SNAPSHOT_TTL_SECONDS: int = 10     # bounds how stale other workers' snapshots can get
+
+    # Principal cache
+    PRINCIPAL_CACHE_SIZE: int = 10000       # deployment total
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
     # AWS USER
     AWS_SECRET_ACCESS_KEY: str
     AWS_ACCESS_KEY: str
     AWS_REGION: str
     S3_BUCKET: str
+    S3_ENDPOINT_URL: Optional[str] = Field(default=None)
+    S3_MAX_POOL_CONNECTIONS: int = 20       # deployment total
+    S3_KEEPALIVE_SECONDS: int = 30
+    S3_CONNECT_RETRY_BASE_SECONDS: float = 1     # backoff between attempts to open the client while S3 is down
+    S3_CONNECT_RETRY_MAX_SECONDS: float = 60
+
+    # HTTP caching
+    POST_SHARED_CACHE_SECONDS: int = 5      # s-maxage for anonymous /view-post, honoured by the nginx micro-cache
+
+    # Presigned URLs
+    PRESIGNED_URL_EXPIRES_SECONDS: int = 3600
+    PRESIGNED_URL_SAFETY_MARGIN_SECONDS: int = 300
+    PRESIGNED_URL_CACHE_SIZE: int = 10000   # deployment total
+
+    # Document uploads
+    MAX_UPLOAD_SIZE_MB: int = 20            # nginx caps bodies separately: raise client_max_body_size in nginx.conf and nginx.http.conf with it
+    S3_UPLOAD_PART_SIZE_MB: int = 8
+    S3_UPLOAD_MAX_CONCURRENCY: int = 4
+
+    # S3 outbox: object deletes queued in the same transaction as the row change
+    S3_OUTBOX_IN_PROCESS: bool = True       # run the worker inside the API processes
+    S3_OUTBOX_BATCH_SIZE: int = 1000        # delete_objects takes at most 1000 keys
+    S3_OUTBOX_POLL_SECONDS: float = 5
+    S3_OUTBOX_RETRY_BASE_SECONDS: float = 5
+    S3_OUTBOX_RETRY_MAX_SECONDS: float = 3600
+    # An upload's object is deleted after this long unless its document row was committed
+    UPLOAD_INTENT_GRACE_SECONDS: int = 3600
+
+    # Document text extraction
+    EXTRACTION_IN_PROCESS: bool = True      # run the extraction worker inside the API processes
+    EXTRACTION_WORKERS: int = 2             # deployment total; parser processes
+    EXTRACTION_MAX_CHARS: int = 500000      # body text indexed per document
+    EXTRACTION_TIMEOUT_SECONDS: float = 120
+    EXTRACTION_POLL_SECONDS: float = 10
+    EXTRACTION_STALE_SECONDS: int = 900     # re-queue documents whose worker died mid-extraction
+    # Downloads that fail are retried with capped exponential backoff, then marked failed
+    EXTRACTION_MAX_ATTEMPTS: int = 8
+    EXTRACTION_RETRY_BASE_SECONDS: float = 30
+    EXTRACTION_RETRY_MAX_SECONDS: float = 3600
+
+    # Rate limiting: per-client token buckets on the expensive routes. A policy
+    # "<burst>/<seconds>" allows a burst of that many requests and refills it
+    # evenly over that many seconds.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"      # "memory" (each worker counts alone) or "postgres" (shared by all workers)
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = 100000
+    # Set by nginx from the connecting address; unset it when the API is exposed directly
+    RATE_LIMIT_CLIENT_IP_HEADER: Optional[str] = "X-Real-IP"
+    RATE_LIMIT_LOGIN: str = "10/60"
+    RATE_LIMIT_REGISTER: str = "5/3600"
+    RATE_LIMIT_SEARCH: str = "120/60"
+    RATE_LIMIT_UPLOAD: str = "30/3600"
+
+    # Admission control: past MAX_IN_FLIGHT requests wait for a slot; past
+    # MAX_QUEUED waiting (or after the queue timeout) they are shed with 503
+    ADMISSION_MAX_IN_FLIGHT: int = 128      # deployment total
+    ADMISSION_MAX_QUEUED: int = 256         # deployment total
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 5
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
 
     # Admin user (optional)
     ADMIN_USERNAME: Optional[str] = Field(default=None)
     ADMIN_EMAIL: Optional[EmailStr] = Field(default=None)
     ADMIN_PASSWORD: Optional[str] = Field(default=None)
 
+    def per_worker(self, total: int, minimum: int = 1) -> int:
+        return max(minimum, total // max(1, self.API_WORKERS))
+
     class Config:
         env_file = Path(__file__).resolve().parents[2]/".env"
         extra = Extra.allow
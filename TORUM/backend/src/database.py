@@ -1,9 +1,16 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from typing import AsyncGenerator
+from fastapi import Request
+from typing import AsyncGenerator, Optional
 
 from backend.src.config import get_settings
+from backend.src.metrics import instrument_engine
 
 settings = get_settings()
 
@@ -17,7 +24,41 @@ SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
 
 Base = declarative_base()
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True, future=True)
+def asyncpg_connect_args() -> dict:
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer in transaction mode may hand every transaction a different
+        # server connection, so named prepared statements can't be reused and
+        # non-standard startup parameters would be rejected.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            "server_settings": {"application_name": "torum"},
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {
+            "application_name": "torum",
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+        },
+    }
+
+def create_engine_from_settings(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        pool_size=settings.per_worker(settings.DB_POOL_SIZE),
+        max_overflow=settings.per_worker(settings.DB_MAX_OVERFLOW, minimum=0),
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=asyncpg_connect_args(),
+    )
+
+engine = create_engine_from_settings(SQLALCHEMY_DATABASE_URL)
+instrument_engine(engine, "primary")
 
 SessionLocal: AsyncSession = sessionmaker (
     autoflush=False,
@@ -29,4 +70,99 @@ SessionLocal: AsyncSession = sessionmaker (
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def warm_up_pool(target_engine: AsyncEngine, connections: int) -> None:
+    """Open up to `connections` pooled connections before the app reports ready,
+    so the first burst of traffic after a deploy doesn't become a connect storm."""
+    async def checkout():
+        async with target_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    connections = min(settings.per_worker(connections, minimum=0), settings.per_worker(settings.DB_POOL_SIZE))
+    await asyncio.gather(*(checkout() for _ in range(connections)))
+
+#---------------------------------------------------------------#
+
+####     READ REPLICA     ####
+
+replica_engine: Optional[AsyncEngine] = None
+ReadSessionLocal = SessionLocal
+if settings.SQLALCHEMY_READ_REPLICA_URL:
+    replica_engine = create_engine_from_settings(settings.SQLALCHEMY_READ_REPLICA_URL)
+    instrument_engine(replica_engine, "replica")
+    ReadSessionLocal = sessionmaker(
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+        class_=AsyncSession,
+        bind=replica_engine
+    )
+
+# Flipped by monitor_replica(); reads stay on the primary until the first health check passes.
+replica_healthy = False
+
+# Successful writes set this cookie to the unix time until which the client's
+# reads must go to the primary, so a post created on the primary shows up in
+# the very next /my-posts even if the replica hasn't replayed it yet. A cookie
+# rather than server state keeps the pin valid across worker processes.
+PRIMARY_PIN_COOKIE = "torum_primary_until"
+
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+def read_sessionmaker(request: Request):
+    if replica_engine is None or not replica_healthy:
+        return SessionLocal
+    pinned_until = request.cookies.get(PRIMARY_PIN_COOKIE, "")
+    if pinned_until.isdigit() and int(pinned_until) > time.time():
+        return SessionLocal
+    return ReadSessionLocal
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with read_sessionmaker(request)() as session:
+        yield session
+
+async def check_replica() -> bool:
+    try:
+        async with replica_engine.connect() as connection:
+            lag = (await asyncio.wait_for(connection.execute(REPLICA_LAG_QUERY), settings.REPLICA_HEALTH_CHECK_SECONDS)).scalar()
+    except Exception as e:
+        print("Replica health check failed: ", {e})
+        return False
+    return float(lag) <= settings.REPLICA_MAX_LAG_SECONDS
+
+async def monitor_replica() -> None:
+    global replica_healthy
+    while True:
+        replica_healthy = await check_replica()
+        await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+class ReadYourWritesMiddleware:
+    """Pins a client to the primary for READ_YOUR_WRITES_SECONDS after any successful write."""
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS or replica_engine is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                pinned_until = int(time.time()) + settings.READ_YOUR_WRITES_SECONDS
+                cookie = (f"{PRIMARY_PIN_COOKIE}={pinned_until}; Max-Age={settings.READ_YOUR_WRITES_SECONDS}; "
+                          "Path=/; HttpOnly; SameSite=Lax")
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+####     END READ REPLICA     ####
@@ -1,23 +1,39 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from sqlalchemy import select
+from sqlalchemy import select, text
 
 from backend.src.auth import router
 from backend.src.auth.models import User
-from backend.src.auth.services import get_password_hash
+from backend.src.auth.outbox import run_outbox_worker
+from backend.src.auth.extraction import run_extraction_worker
+from backend.src.auth.revocation import load_revoked_tokens, run_revocation_sync
+from backend.src.auth.utils import start_s3_client, stop_s3_client
+from backend.src.auth.services import get_password_hash_async, start_password_hasher, stop_password_hasher
 from backend.src.config import get_settings
-from backend.src.database import SessionLocal
+from backend.src.metrics import MetricsMiddleware, metrics_route
+from backend.src.notify import run_listener
+from backend.src.admission import AdmissionMiddleware
+from backend.src.database import SessionLocal, engine, replica_engine, warm_up_pool, check_replica, monitor_replica, ReadYourWritesMiddleware
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    settings = get_settings()
+# Arbitrary application-wide key for pg_advisory_xact_lock.
+ADMIN_SEED_LOCK_KEY = 7_140_001
+
+async def seed_admin(settings) -> None:
+    """Create the configured admin once. With several workers starting at the
+    same time, the advisory lock makes them take turns, so only the first one
+    inserts and the rest see its row."""
+    if not (settings.ADMIN_EMAIL and settings.ADMIN_PASSWORD and settings.ADMIN_USERNAME):
+        return
     async with SessionLocal() as session:
-        if settings.ADMIN_EMAIL and settings.ADMIN_PASSWORD and settings.ADMIN_USERNAME:
-            result = await session.execute(select(User).where(User.user_role == "admin"))
+        async with session.begin():
+            await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADMIN_SEED_LOCK_KEY})
+            result = await session.execute(select(User).where(User.user_role == "admin").limit(1))
             admin = result.scalar_one_or_none()
             if not admin:
-                hashed_pw = get_password_hash(settings.ADMIN_PASSWORD)
+                hashed_pw = await get_password_hash_async(settings.ADMIN_PASSWORD)
                 admin_user = User(
                     username=settings.ADMIN_USERNAME,
                     email=settings.ADMIN_EMAIL,
@@ -25,16 +41,54 @@ async def lifespan(app: FastAPI):
                     user_role="admin",
                 )
                 session.add(admin_user)
-                await session.commit()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    await warm_up_pool(engine, settings.DB_POOL_WARMUP_CONNECTIONS)
+    replica_monitor = None
+    if replica_engine is not None:
+        if await check_replica():
+            await warm_up_pool(replica_engine, settings.DB_POOL_WARMUP_CONNECTIONS)
+        replica_monitor = asyncio.create_task(monitor_replica())
+    start_password_hasher()
+    try:
+        await start_s3_client()
+    except Exception as e:
+        # get_s3_client retries on the first request that needs it.
+        print("S3 client start failed: ", {e})
+    await seed_admin(settings)
+    notification_listener = asyncio.create_task(run_listener())
+    await load_revoked_tokens()
+    revocation_sync = asyncio.create_task(run_revocation_sync())
+    outbox_worker = asyncio.create_task(run_outbox_worker()) if settings.S3_OUTBOX_IN_PROCESS else None
+    extraction_worker = asyncio.create_task(run_extraction_worker()) if settings.EXTRACTION_IN_PROCESS else None
     yield
+    for worker in (notification_listener, revocation_sync, outbox_worker, extraction_worker):
+        if worker is not None:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+        await replica_engine.dispose()
+    await stop_s3_client()
+    stop_password_hasher()
+    await engine.dispose()
 
+# No default_response_class: routes with a response_model are then serialized
+# straight to JSON bytes by Pydantic, without a jsonable_encoder pass.
 app = FastAPI(lifespan=lifespan)
 
+# Innermost, so shed requests still get CORS headers and are counted by MetricsMiddleware.
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(CORSMiddleware, 
                    allow_origins=["*"],
                    allow_credentials=True,
                    allow_methods=["*"],
-                   allow_headers=["*"])
+                   allow_headers=["*"],
+                   expose_headers=[router.NEXT_CURSOR_HEADER])
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(router.register_route)
 app.include_router(router.login_route)
@@ -43,4 +97,5 @@ app.include_router(router.refresh_token_route)
 app.include_router(router.get_user_route)
 app.include_router(router.post_route)
 app.include_router(router.reading_documents_route)
-app.include_router(router.search_route)
\ No newline at end of file
+app.include_router(router.search_route)
+app.include_router(metrics_route)
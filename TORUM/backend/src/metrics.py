@@ -0,0 +1,252 @@
+import os
+import time
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Prometheus text exposition, kept in-process and allocation-light: every
+# series is a fixed-size list updated in place, and the text is only built when
+# /metrics is scraped. With API_WORKERS > 1 each process keeps its own numbers,
+# so every series carries the worker's pid and the scraper sums across them.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+WORKER = str(os.getpid())
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self, lines: List[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{{{_format_labels(self.label_names, labels)}}} {value}")
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple[str, ...], amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) - amount
+
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        self.values[labels] = value
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [count per bucket..., +Inf count, sum]
+        self.values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, lines: List[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for labels, series in self.values.items():
+            label_text = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    pairs = [f'worker="{WORKER}"']
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return ",".join(pairs)
+
+#---------------------------------------------------------------#
+
+####     REGISTRY     ####
+
+http_requests = Counter("torum_http_requests_total", "HTTP responses by route template and status code.", ("method", "route", "status"))
+http_duration = Histogram("torum_http_request_duration_seconds", "Time from request start to the end of the response body.", ("method", "route"), LATENCY_BUCKETS)
+http_in_flight = Gauge("torum_http_requests_in_flight", "Requests currently being handled.", ())
+db_queries_per_request = Histogram("torum_db_queries_per_request", "SQL statements issued while handling one request.", ("route",), QUERY_COUNT_BUCKETS)
+db_time_per_request = Histogram("torum_db_time_per_request_seconds", "Time spent waiting on SQL statements while handling one request.", ("route",), LATENCY_BUCKETS)
+db_query_duration = Histogram("torum_db_query_duration_seconds", "Duration of individual SQL statements.", ("engine",), LATENCY_BUCKETS)
+dependency_duration = Histogram("torum_dependency_duration_seconds", "Duration of calls to S3 and the password hasher.", ("dependency", "operation", "outcome"), LATENCY_BUCKETS)
+cache_entries = Gauge("torum_cache_entries", "Entries currently held by an in-process cache.", ("cache",))
+cache_hits = Counter("torum_cache_hits_total", "Cache lookups that found a live entry.", ("cache",))
+cache_misses = Counter("torum_cache_misses_total", "Cache lookups that found nothing or an expired entry.", ("cache",))
+cache_evictions = Counter("torum_cache_evictions_total", "Entries dropped to stay within the cache size.", ("cache",))
+rate_limited = Counter("torum_rate_limited_total", "Requests rejected with 429 by a rate-limit policy.", ("policy",))
+admission_queued = Gauge("torum_admission_queued", "Requests waiting for an admission slot.", ())
+admission_shed = Counter("torum_admission_shed_total", "Requests shed with 503 by admission control.", ("reason",))
+revocation_checks = Counter("torum_token_revocation_checks_total", "Token revocation lookups: filter miss, filter false positive, or revoked.", ("result",))
+
+METRICS = [http_requests, http_duration, http_in_flight, db_queries_per_request, db_time_per_request,
+           db_query_duration, dependency_duration, cache_entries, cache_hits, cache_misses, cache_evictions,
+           rate_limited, admission_queued, admission_shed, revocation_checks]
+
+# Callables run right before each scrape to copy point-in-time values (cache sizes, ...) into gauges.
+_collectors: List[Callable[[], None]] = []
+
+def register_cache(name: str, cache) -> None:
+    def collect() -> None:
+        stats = cache.stats()
+        cache_entries.set((name,), stats["size"])
+        cache_hits.values[(name,)] = stats["hits"]
+        cache_misses.values[(name,)] = stats["misses"]
+        cache_evictions.values[(name,)] = stats["evictions"]
+    _collectors.append(collect)
+
+def render_metrics() -> str:
+    for collect in _collectors:
+        collect()
+    lines: List[str] = []
+    for metric in METRICS:
+        metric.render(lines)
+    lines.append("")
+    return "\n".join(lines)
+
+####     END REGISTRY     ####
+
+#---------------------------------------------------------------#
+
+####     DEPENDENCY TIMERS     ####
+
+class timed:
+    """`with timed("s3", "put_object"):` records the block's duration, tagged ok/error."""
+
+    __slots__ = ("labels", "start")
+
+    def __init__(self, dependency: str, operation: str):
+        self.labels = (dependency, operation)
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "ok" if exc_type is None else "error"
+        dependency_duration.observe((*self.labels, outcome), time.perf_counter() - self.start)
+        return False
+
+####     END DEPENDENCY TIMERS     ####
+
+#---------------------------------------------------------------#
+
+####     SQL INSTRUMENTATION     ####
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+# Set by MetricsMiddleware for the duration of a request. Tasks spawned by the
+# handler (parallel search) copy the context and so share the same object.
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+def instrument_engine(target_engine: AsyncEngine, name: str) -> None:
+    sync_engine = target_engine.sync_engine
+    labels = (name,)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_query_duration.observe(labels, elapsed)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+####     END SQL INSTRUMENTATION     ####
+
+#---------------------------------------------------------------#
+
+####     HTTP MIDDLEWARE     ####
+
+class MetricsMiddleware:
+    """Per-route latency, status codes, in-flight requests and per-request SQL totals.
+
+    Routes are labelled with their path template (/view-post/{post_id}), never
+    the concrete URL, so the number of series stays bounded."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+        http_in_flight.inc(())
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request_stats.reset(token)
+            http_in_flight.dec(())
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            method = scope["method"]
+            http_requests.inc((method, route, str(status)))
+            http_duration.observe((method, route), time.perf_counter() - start)
+            db_queries_per_request.observe((route,), stats.queries)
+            db_time_per_request.observe((route,), stats.db_seconds)
+
+####     END HTTP MIDDLEWARE     ####
+
+#---------------------------------------------------------------#
+
+####     METRICS ROUTE     ####
+
+metrics_route = APIRouter(
+    tags=["Metrics"]
+)
+
+@metrics_route.get('/metrics', include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+####     END METRICS ROUTE     ####
@@ -0,0 +1,77 @@
+import asyncio
+
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+
+from backend.src.config import get_settings
+from backend.src.database import SQLALCHEMY_DATABASE_URL
+
+settings = get_settings()
+
+# One LISTEN connection per process, shared by everything that keeps per-worker
+# state in step with the other workers (revoked tokens, cached principals).
+# Senders call pg_notify inside their own transaction, so a notification goes
+# out only if the change commits. LISTEN holds its session for as long as the
+# worker runs, so it gets a connection of its own instead of a pooled one.
+
+RECONNECT_SECONDS = 5
+
+_handlers: Dict[str, Callable[[str], None]] = {}
+_on_connect: List[Callable[[], None]] = []
+_connection: Optional[asyncpg.Connection] = None
+
+def listen(channel: str, handler: Callable[[str], None], on_connect: Optional[Callable[[], None]] = None) -> None:
+    """Call handler(payload) for every notification on channel. on_connect runs
+    each time the listener (re)connects, after LISTEN is in place, to catch up on
+    whatever was sent while it was down."""
+    _handlers[channel] = handler
+    if on_connect is not None:
+        _on_connect.append(on_connect)
+
+def is_listening() -> bool:
+    return _connection is not None and not _connection.is_closed()
+
+def listen_url() -> str:
+    return (settings.DB_LISTEN_URL or SQLALCHEMY_DATABASE_URL).replace("+asyncpg", "")
+
+def can_listen() -> bool:
+    # PgBouncer in transaction mode can't hold a LISTEN; DB_LISTEN_URL goes around it.
+    return not settings.DB_PGBOUNCER_MODE or bool(settings.DB_LISTEN_URL)
+
+def _dispatch(connection, pid, channel, payload) -> None:
+    handler = _handlers.get(channel)
+    if handler is not None:
+        handler(payload)
+
+def _on_termination(connection) -> None:
+    global _connection
+    if connection is _connection:
+        _connection = None
+
+async def _connect() -> asyncpg.Connection:
+    connection = await asyncpg.connect(listen_url())
+    connection.add_termination_listener(_on_termination)
+    for channel in _handlers:
+        await connection.add_listener(channel, _dispatch)
+    return connection
+
+async def run_listener() -> None:
+    global _connection
+    if not can_listen():
+        return
+    try:
+        while True:
+            if not is_listening():
+                try:
+                    _connection = await _connect()
+                    for callback in _on_connect:
+                        callback()
+                except Exception as e:
+                    print("Notification listener error: ", {e})
+                    _connection = None
+            await asyncio.sleep(RECONNECT_SECONDS)
+    finally:
+        connection, _connection = _connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
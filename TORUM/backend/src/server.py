@@ -0,0 +1,18 @@
+import uvicorn
+
+from backend.src.config import get_settings
+
+def main() -> None:
+    settings = get_settings()
+    if settings.API_WORKERS > 1 and settings.DB_PGBOUNCER_MODE and not settings.DB_LISTEN_URL:
+        print("API_WORKERS > 1 behind PgBouncer without DB_LISTEN_URL: workers can't hear each "
+              "other's invalidations, so the principal cache is bypassed.")
+    uvicorn.run(
+        "backend.src.main:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=settings.API_WORKERS,
+    )
+
+if __name__ == "__main__":
+    main()
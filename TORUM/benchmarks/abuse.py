@@ -0,0 +1,193 @@
+"""Abuse load test: does the API stay responsive for well-behaved clients while others flood it?
+
+Load a dataset with ``benchmarks.datagen`` first. Start the API directly, not
+behind nginx, against the same database, and run:
+
+    python -m benchmarks.abuse --manifest benchmarks/results/dataset.json \\
+        --abusers 200 --abuse login,search --polite 8 --polite-rps 2 --duration 60
+
+Abusers are closed-loop clients that never back off. Each one sends the next
+request as soon as the last one returns. /login gets a real email with a wrong
+password, so every attempt costs a bcrypt verify. /search gets random prefix
+queries and /register gets fresh accounts. Polite clients pace themselves to
+--polite-rps and alternate between /view-post and /search. Each client sends
+its own X-Real-IP, as nginx would, so the per-IP buckets see distinct clients.
+
+Run it twice, once with RATE_LIMIT_ENABLED=false and a large
+ADMISSION_MAX_IN_FLIGHT and once with the defaults, then diff the two reports
+with ``benchmarks.compare``. The polite_* rows are the ones that should hold
+steady. The abuser_* rows show how much abuse was turned away with 429/503.
+
+``--check-backends`` needs no server. It runs two simulated workers against
+(a) a bucket store each and (b) one store shared between them, the same way
+a shared backend is plugged in with set_rate_limit_backend. It reports how many
+requests each setup admitted against the policy's budget.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.common import summarize
+from benchmarks.loadtest import git_commit
+
+
+def fake_ip(kind: str, index: int) -> str:
+    return f"10.{1 if kind == 'abuser' else 2}.{index // 250}.{index % 250 + 1}"
+
+
+async def abuse_login(client: httpx.AsyncClient, manifest: dict, rng: random.Random, headers: dict) -> httpx.Response:
+    return await client.post("/login", headers=headers,
+                             data={"username": rng.choice(manifest["emails"]), "password": "not-the-password"})
+
+
+async def abuse_search(client: httpx.AsyncClient, manifest: dict, rng: random.Random, headers: dict) -> httpx.Response:
+    return await client.get("/search", headers=headers, params={"query": rng.choice(manifest["search_terms"])[:3]})
+
+
+async def abuse_register(client: httpx.AsyncClient, manifest: dict, rng: random.Random, headers: dict) -> httpx.Response:
+    name = uuid.uuid4().hex[:12]
+    return await client.post("/register", headers=headers,
+                             json={"username": name, "email": f"{name}@abuse.example.com", "password": "abuse-password"})
+
+
+ABUSE = {"login": abuse_login, "search": abuse_search, "register": abuse_register}
+
+
+async def polite_view_post(client: httpx.AsyncClient, manifest: dict, rng: random.Random, headers: dict) -> httpx.Response:
+    return await client.get(f"/view-post/{rng.choice(manifest['post_ids'])}", headers=headers)
+
+
+async def polite_search(client: httpx.AsyncClient, manifest: dict, rng: random.Random, headers: dict) -> httpx.Response:
+    return await client.get("/search", headers=headers, params={"query": rng.choice(manifest["search_terms"])})
+
+
+POLITE = {"view_post": polite_view_post, "search": polite_search}
+
+
+async def run(args, manifest: dict) -> dict:
+    abuse = [name.strip() for name in args.abuse.split(",") if name.strip()]
+    unknown = [name for name in abuse if name not in ABUSE]
+    if unknown:
+        raise SystemExit(f"unknown --abuse target(s): {', '.join(unknown)} (choose from {', '.join(ABUSE)})")
+    samples, statuses = {}, {}
+
+    def record(name: str, started: float, status) -> None:
+        samples.setdefault(name, []).append(time.perf_counter() - started)
+        statuses.setdefault(name, {})
+        statuses[name][status] = statuses[name].get(status, 0) + 1
+
+    async def call(name: str, request, rng: random.Random, headers: dict) -> None:
+        started = time.perf_counter()
+        try:
+            status = (await request(client, manifest, rng, headers)).status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        record(name, started, status)
+
+    async def abuser(index: int, stop_at: float) -> None:
+        rng = random.Random(args.seed + index)
+        headers = {"X-Real-IP": fake_ip("abuser", index)}
+        while time.perf_counter() < stop_at:
+            target = rng.choice(abuse)
+            await call(f"abuser_{target}", ABUSE[target], rng, headers)
+
+    async def polite(index: int, stop_at: float) -> None:
+        rng = random.Random(args.seed + 100000 + index)
+        headers = {"X-Real-IP": fake_ip("polite", index)}
+        names = list(POLITE)
+        interval = 1 / args.polite_rps
+        next_at = time.perf_counter()
+        sent = 0
+        while time.perf_counter() < stop_at:
+            name = names[sent % len(names)]
+            sent += 1
+            await call(f"polite_{name}", POLITE[name], rng, headers)
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    limits = httpx.Limits(max_connections=args.abusers + args.polite)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        stop_at = start + args.duration
+        await asyncio.gather(*(abuser(i, stop_at) for i in range(args.abusers)),
+                             *(polite(i, stop_at) for i in range(args.polite)))
+        elapsed = time.perf_counter() - start
+
+    return {name: {**summarize(samples[name], elapsed), "statuses": {str(k): v for k, v in statuses[name].items()}}
+            for name in sorted(samples)}
+
+
+async def check_backends() -> dict:
+    """Two workers, 50 requests each, one client, against the login policy."""
+    # Imported here so the load test itself doesn't need the API's settings.
+    from backend.src.auth.ratelimit import POLICIES, MemoryRateLimitBackend
+
+    policy = POLICIES["login"]
+    attempts = 50
+
+    async def admitted(backends) -> int:
+        allowed = 0
+        for _ in range(attempts):
+            for backend in backends:
+                allowed += await backend.acquire("login:ip:10.0.0.1", policy) == 0
+        return allowed
+
+    shared = MemoryRateLimitBackend()
+    return {
+        "policy": policy._asdict(),
+        "requests": attempts * 2,
+        "per_worker_admitted": await admitted([MemoryRateLimitBackend(), MemoryRateLimitBackend()]),
+        "shared_admitted": await admitted([shared, shared]),
+        "budget": policy.burst,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--manifest", default="benchmarks/results/dataset.json")
+    parser.add_argument("--abuse", default="login,search", help=f"comma-separated subset of {', '.join(ABUSE)}")
+    parser.add_argument("--abusers", type=int, default=200)
+    parser.add_argument("--polite", type=int, default=8)
+    parser.add_argument("--polite-rps", type=float, default=2.0, help="requests per second per polite client")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--check-backends", action="store_true")
+    parser.add_argument("--output", help="defaults to benchmarks/results/abuse-<commit>-<timestamp>.json")
+    args = parser.parse_args()
+
+    if args.check_backends:
+        print(json.dumps(await check_backends(), indent=2))
+        return
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    commit = git_commit()
+    started_at = datetime.now(timezone.utc)
+    report = {
+        "commit": commit,
+        "started_at": started_at.isoformat(),
+        "config": {key: getattr(args, key) for key in ("base_url", "abuse", "abusers", "polite", "polite_rps", "duration", "seed")},
+        "endpoints": await run(args, manifest),
+    }
+
+    output = args.output or f"benchmarks/results/abuse-{commit}-{started_at:%Y%m%dT%H%M%S}.json"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["endpoints"], indent=2))
+    print(f"report written to {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""Diff two load-test reports endpoint by endpoint.
+
+    python -m benchmarks.compare benchmarks/results/loadtest-<old>.json benchmarks/results/loadtest-<new>.json
+
+Positive latency deltas and negative throughput deltas are regressions.
+"""
+import argparse
+import json
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change(old: float, new: float) -> str:
+    if not old:
+        return f"{new:>10}"
+    return f"{new:>10} ({(new - old) / old * 100:+.1f}%)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')}")
+    print(f"{'endpoint':<12}" + "".join(f"{metric:>22}" for metric in METRICS))
+    for name, new in candidate["endpoints"].items():
+        old = baseline["endpoints"].get(name, {})
+        print(f"{name:<12}" + "".join(f"{change(old.get(metric, 0), new[metric]):>22}" for metric in METRICS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Bulk-load a synthetic dataset of users, posts and documents into Postgres.
+
+Run against a local, migrated database (Postgres fills the generated
+search_vector columns as rows are copied in), optionally with a local S3 stand-in such as
+``moto_server -p 5000`` so the document objects exist too:
+
+    python -m benchmarks.datagen --users 1000 --posts 50000 --documents 5000 \\
+        --s3-endpoint-url http://localhost:5000 --manifest benchmarks/results/dataset.json
+
+Text is drawn from a fixed vocabulary with a Zipf-like word distribution, so a
+few terms match most rows and most terms match few, as in real forum text.
+The manifest lists the credentials and ids the load driver needs. The same
+--seed always produces the same dataset.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import uuid
+
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+
+from aiobotocore.session import get_session
+
+from backend.src.auth.services import get_password_hash
+from backend.src.config import get_settings
+
+STOPWORDS = """
+the of and to in is for that with on as it be are this by from or at an have not
+which was can their more has about one will all also these other its been when
+than into some only would how such may any over most each
+""".split()
+
+# Ordered roughly from most to least frequent.
+TOPIC_WORDS = """
+time use new first study learn course lecture exam notes chapter question answer problem solution
+example theory method data model system network design analysis research paper
+student teacher class school university library book reading document summary
+review assignment project group team meeting schedule deadline grade score test
+math physics chemistry biology history literature language english grammar essay
+algorithm program code python java database query index server client request
+function variable loop array string number matrix vector graph tree search sort
+memory cache thread process performance security password login account forum
+post reply comment topic discussion opinion idea help advice tip guide
+tutorial beginner advanced practice exercise homework quiz midterm final semester
+calculus algebra geometry statistics probability derivative integral equation
+economics market price demand supply policy government law society culture art
+music film photo travel food health sport game weather news event community
+""".split()
+
+VOCABULARY = STOPWORDS + TOPIC_WORDS
+
+TAGS = ["Documents", "Lecture Notes", "Exam", "Slides", "Assignment", "Reference", "Summary", "Textbook"]
+
+# Smallest file the upload route accepts as a PDF; the body doesn't matter to S3.
+PLACEHOLDER_PDF = b"%PDF-1.4\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n"
+
+BATCH_SIZE = 5000
+
+
+class TextGenerator:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        # Zipf-like: the k-th most common word is drawn with weight 1/k.
+        self.weights = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+    def words(self, count: int) -> str:
+        return " ".join(self.rng.choices(VOCABULARY, weights=self.weights, k=count))
+
+    def title(self) -> str:
+        return self.words(self.rng.randint(3, 9)).capitalize()
+
+    def body(self, mean_words: int) -> str:
+        sentences = []
+        remaining = max(5, int(self.rng.expovariate(1 / mean_words)))
+        while remaining > 0:
+            length = min(remaining, self.rng.randint(6, 20))
+            sentences.append(self.words(length).capitalize() + ".")
+            remaining -= length
+        return " ".join(sentences)
+
+
+def database_dsn(dsn: str = None) -> str:
+    # asyncpg wants a plain postgresql:// URL, not SQLAlchemy's postgresql+asyncpg://
+    return (dsn or get_settings().SQLALCHEMY_DATABASE_URL).replace("+asyncpg", "")
+
+
+async def copy_in_batches(connection, table: str, columns, rows) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        await connection.copy_records_to_table(table, records=rows[start:start + BATCH_SIZE], columns=columns)
+
+
+async def upload_placeholders(args, keys) -> None:
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(args.s3_concurrency)
+    async with get_session().create_client(
+        "s3",
+        region_name=settings.AWS_REGION,
+        endpoint_url=args.s3_endpoint_url,
+        aws_access_key_id=settings.AWS_ACCESS_KEY,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+    ) as client:
+        try:
+            await client.create_bucket(Bucket=settings.S3_BUCKET)
+        except client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+        async def put(key: str) -> None:
+            async with semaphore:
+                await client.put_object(Bucket=settings.S3_BUCKET, Key=key, Body=PLACEHOLDER_PDF, ContentType="application/pdf")
+
+        await asyncio.gather(*(put(key) for key in keys))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", help="defaults to SQLALCHEMY_DATABASE_URL from the environment")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--post-words", type=int, default=300, help="mean words per post body")
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=365, help="spread created_at over this many days")
+    parser.add_argument("--s3-endpoint-url", help="also create the bucket and document objects on this S3 endpoint")
+    parser.add_argument("--s3-concurrency", type=int, default=32)
+    parser.add_argument("--manifest", default="benchmarks/results/dataset.json")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    text = TextGenerator(rng)
+    now = datetime.now(timezone.utc)
+
+    def timestamp() -> datetime:
+        return now - timedelta(seconds=rng.randint(0, args.days * 86400))
+
+    # One bcrypt hash shared by every user: hashing N passwords would dominate the run.
+    hashed_password = get_password_hash(args.password)
+    users = [(uuid.UUID(int=rng.getrandbits(128), version=4), f"bench_user_{i}", f"bench_user_{i}@example.com", hashed_password, "user")
+             for i in range(args.users)]
+    user_ids = [user[0] for user in users]
+
+    posts = []
+    for _ in range(args.posts):
+        created_at = timestamp()
+        posts.append((uuid.UUID(int=rng.getrandbits(128), version=4), rng.choice(user_ids), text.title(),
+                      text.body(args.post_words), created_at, None))
+
+    documents = []
+    for i in range(args.documents):
+        owner = rng.choice(user_ids)
+        documents.append((uuid.UUID(int=rng.getrandbits(128), version=4), owner, text.title(), text.body(40),
+                          rng.choice(TAGS), f"{owner}/bench-{i}.pdf", timestamp()))
+
+    connection = await asyncpg.connect(database_dsn(args.dsn))
+    try:
+        async with connection.transaction():
+            await copy_in_batches(connection, "users", ("user_id", "username", "email", "hashed_password", "user_role"), users)
+            await copy_in_batches(connection, "posts", ("post_id", "post_owner", "post_title", "post_content", "created_at", "updated_at"), posts)
+            await copy_in_batches(connection, "reading_documents", ("docs_id", "docs_owner", "docs_title", "docs_description",
+                                                                    "docs_tags", "docs_file_path", "uploaded_at"), documents)
+        await connection.execute("ANALYZE users; ANALYZE posts; ANALYZE reading_documents;")
+    finally:
+        await connection.close()
+
+    if args.s3_endpoint_url:
+        await upload_placeholders(args, [document[5] for document in documents])
+
+    sample = random.Random(args.seed + 1)
+    manifest = {
+        "seed": args.seed,
+        "password": args.password,
+        "emails": [user[2] for user in sample.sample(users, min(len(users), 200))],
+        "post_ids": [str(post[0]) for post in sample.sample(posts, min(len(posts), 1000))],
+        "document_ids": [str(document[0]) for document in sample.sample(documents, min(len(documents), 1000))],
+        "search_terms": TOPIC_WORDS[:40] + TOPIC_WORDS[-40:],
+        "counts": {"users": args.users, "posts": args.posts, "documents": args.documents},
+    }
+    os.makedirs(os.path.dirname(args.manifest) or ".", exist_ok=True)
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(json.dumps(manifest["counts"]))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
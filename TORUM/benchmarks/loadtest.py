@@ -0,0 +1,168 @@
+"""Mixed-endpoint load test with per-endpoint throughput and latency percentiles.
+
+Load a dataset with ``benchmarks.datagen`` first, then start the API against
+the same database and a local S3 stand-in (``S3_ENDPOINT_URL=http://localhost:5000``)
+and run:
+
+    python -m benchmarks.loadtest --manifest benchmarks/results/dataset.json \\
+        --concurrency 64 --duration 60 --mix search=35,view_post=30,my_posts=15,download=12,upload=5,login=3
+
+Run the API with RATE_LIMIT_ENABLED=false: every virtual user comes from the
+same address, so the per-IP login and search buckets would otherwise throttle
+the run. benchmarks.abuse covers the limiter itself.
+
+Each virtual user logs in once as one of the dataset's users and then picks
+requests from the mix at random. The report is written as JSON, named after
+the current commit, so two runs can be diffed with ``benchmarks.compare``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.common import summarize
+from benchmarks.datagen import PLACEHOLDER_PDF
+
+DEFAULT_MIX = "search=35,view_post=30,my_posts=15,download=12,upload=5,login=3"
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise SystemExit(f"unknown endpoint in --mix: {name!r} (choose from {', '.join(ENDPOINTS)})")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, manifest: dict, rng: random.Random):
+        self.client = client
+        self.manifest = manifest
+        self.rng = rng
+        self.email = rng.choice(manifest["emails"])
+        self.headers = {}
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post("/login", data={"username": self.email, "password": self.manifest["password"]})
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def search(self) -> httpx.Response:
+        terms = " ".join(self.rng.sample(self.manifest["search_terms"], self.rng.randint(1, 2)))
+        return await self.client.get("/search", params={"query": terms})
+
+    async def view_post(self) -> httpx.Response:
+        return await self.client.get(f"/view-post/{self.rng.choice(self.manifest['post_ids'])}")
+
+    async def my_posts(self) -> httpx.Response:
+        return await self.client.get("/my-posts", headers=self.headers)
+
+    async def download(self) -> httpx.Response:
+        return await self.client.get(f"/download-document/{self.rng.choice(self.manifest['document_ids'])}")
+
+    async def upload(self) -> httpx.Response:
+        return await self.client.post(
+            "/upload-reading-documents",
+            headers=self.headers,
+            data={"docs_title": "Load test upload", "docs_description": "Uploaded by benchmarks.loadtest", "docs_tags": "Documents"},
+            files={"file": ("loadtest.pdf", PLACEHOLDER_PDF, "application/pdf")},
+        )
+
+
+ENDPOINTS = {
+    "login": VirtualUser.login,
+    "search": VirtualUser.search,
+    "view_post": VirtualUser.view_post,
+    "my_posts": VirtualUser.my_posts,
+    "download": VirtualUser.download,
+    "upload": VirtualUser.upload,
+}
+
+
+async def run(args, manifest: dict) -> dict:
+    weights = parse_mix(args.mix)
+    names, weight_values = list(weights), list(weights.values())
+    samples = {name: [] for name in names}
+    statuses = {name: {} for name in names}
+
+    async def user_loop(index: int, stop_at: float) -> None:
+        rng = random.Random(args.seed + index)
+        user = VirtualUser(client, manifest, rng)
+        await user.login()
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights=weight_values)[0]
+            start = time.perf_counter()
+            try:
+                status = (await ENDPOINTS[name](user)).status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            samples[name].append(time.perf_counter() - start)
+            statuses[name][status] = statuses[name].get(status, 0) + 1
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        if args.warmup:
+            await asyncio.gather(*(user_loop(i, time.perf_counter() + args.warmup) for i in range(args.concurrency)))
+            samples = {name: [] for name in names}
+            statuses = {name: {} for name in names}
+        start = time.perf_counter()
+        await asyncio.gather(*(user_loop(i, start + args.duration) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {name: {**summarize(samples[name], elapsed), "statuses": {str(k): v for k, v in statuses[name].items()}}
+            for name in names}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--manifest", default="benchmarks/results/dataset.json")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="defaults to benchmarks/results/loadtest-<commit>-<timestamp>.json")
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    commit = git_commit()
+    started_at = datetime.now(timezone.utc)
+    report = {
+        "commit": commit,
+        "started_at": started_at.isoformat(),
+        "config": {key: getattr(args, key) for key in ("base_url", "mix", "concurrency", "duration", "warmup", "seed")},
+        "dataset": manifest.get("counts", {}),
+        "endpoints": await run(args, manifest),
+    }
+
+    output = args.output or f"benchmarks/results/loadtest-{commit}-{started_at:%Y%m%dT%H%M%S}.json"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["endpoints"], indent=2))
+    print(f"report written to {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""Measure /view-post/{id} latency with and without a concurrent login storm.
+
+Run against a live server (``uvicorn backend.src.main:app``) seeded with one
+user and one post:
+
+    python -m benchmarks.login_storm --email user@example.com --password secret --post-id <uuid>
+
+Run the server with RATE_LIMIT_ENABLED=false. The storm logs in from one
+address, and the per-IP login bucket would otherwise answer nearly all of it
+with 429 before bcrypt runs. The login status counts in the report show that.
+
+If password hashing is off the event loop, the p99 of the "storm" phase should
+stay close to the "baseline" phase.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import summarize
+
+
+async def read_loop(client: httpx.AsyncClient, post_id: str, stop_at: float, samples: list) -> None:
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        response = await client.get(f"/view-post/{post_id}")
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+
+
+async def login_loop(client: httpx.AsyncClient, email: str, password: str, stop_at: float, statuses: dict) -> None:
+    while time.perf_counter() < stop_at:
+        response = await client.post("/login", data={"username": email, "password": password})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def run_phase(args, storm: bool) -> dict:
+    samples: list = []
+    statuses: dict = {}
+    limits = httpx.Limits(max_connections=args.readers + args.storm_concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        stop_at = time.perf_counter() + args.duration
+        tasks = [read_loop(client, args.post_id, stop_at, samples) for _ in range(args.readers)]
+        if storm:
+            tasks += [login_loop(client, args.email, args.password, stop_at, statuses) for _ in range(args.storm_concurrency)]
+        await asyncio.gather(*tasks)
+    result = summarize(samples, args.duration)
+    if storm:
+        result["login_statuses"] = statuses
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--post-id", required=True)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--storm-concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    report = {
+        "baseline": await run_phase(args, storm=False),
+        "storm": await run_phase(args, storm=True),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
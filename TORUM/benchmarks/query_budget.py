@@ -0,0 +1,214 @@
+"""Per-route SQL round-trip budgets.
+
+Runs the app in-process (lifespan included) against the local, migrated
+Postgres and S3 stand-in configured in .env. It walks every route through a
+fixed scenario, records the exact SQL statements each request sends, and
+compares the count with that step's budget:
+
+    python -m benchmarks.query_budget            # exits 1 if any step is over budget
+    python -m benchmarks.query_budget --verbose  # also print the statements of passing steps
+    pytest tests/test_query_budget.py            # the same table as a test; skips without Postgres/S3
+
+Authenticated reads are measured after a warm-up request, so their budget
+holds only the route's own queries: resolving the bearer token must cost zero
+queries once the principal cache is warm.
+
+Each run registers a throwaway budget-<random>@example.com user; the posts and
+documents it creates are deleted again by the scenario itself.
+
+When a change legitimately needs another round trip, raise that step's budget
+in the same commit so the increase is visible in review.
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+
+from contextvars import ContextVar
+from typing import List, Optional
+
+import httpx
+
+from sqlalchemy import event
+
+from backend.src.config import get_settings
+from backend.src.database import engine, replica_engine
+from backend.src.main import app
+from benchmarks.datagen import PLACEHOLDER_PDF
+
+
+class RecordedCall:
+    def __init__(self, method: str):
+        self.method = method
+        self.route = "<unmatched>"
+        self.status = None
+        self.statements: List[str] = []
+
+
+class StatementRecorder:
+    """ASGI wrapper that collects the SQL sent while each request is handled.
+
+    Statements are attributed through a contextvar set around the request, so
+    background work such as the replica health check is never counted."""
+
+    def __init__(self, app):
+        self.app = app
+        self.calls: List[RecordedCall] = []
+        self._current: ContextVar[Optional[RecordedCall]] = ContextVar("recorded_call", default=None)
+
+    def attach(self, target_engine) -> None:
+        event.listen(target_engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        call = self._current.get()
+        if call is not None:
+            call.statements.append(" ".join(statement.split()))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        call = RecordedCall(scope["method"])
+        token = self._current.set(call)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                call.status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._current.reset(token)
+            call.route = getattr(scope.get("route"), "path", call.route)
+            self.calls.append(call)
+
+
+class Scenario:
+    def __init__(self, client: httpx.AsyncClient, recorder: StatementRecorder, verbose: bool):
+        self.client = client
+        self.recorder = recorder
+        self.verbose = verbose
+        self.failures = 0
+
+    async def step(self, budget: Optional[int], method: str, url: str, expect: int = 200, **kwargs) -> httpx.Response:
+        """Send one request. budget=None marks setup/warm-up requests that aren't checked."""
+        response = await self.client.request(method, url, **kwargs)
+        if response.status_code != expect:
+            raise SystemExit(f"{method} {url}: expected {expect}, got {response.status_code}: {response.text}")
+        if budget is None:
+            return response
+        call = self.recorder.calls[-1]
+        over = len(call.statements) > budget
+        self.failures += over
+        print(f"{'FAIL' if over else 'ok':<5}{method:<7}{call.route:<40}{len(call.statements):>3} / {budget}")
+        if over or self.verbose:
+            for statement in call.statements:
+                print(f"       {statement}")
+        return response
+
+
+async def measure(verbose: bool = False) -> int:
+    """Walk the scenario once and return the number of steps over budget."""
+    settings = get_settings()
+    recorder = StatementRecorder(app)
+    recorder.attach(engine)
+    if replica_engine is not None:
+        recorder.attach(replica_engine)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=recorder)
+        async with httpx.AsyncClient(transport=transport, base_url="http://query-budget") as client:
+            s = Scenario(client, recorder, verbose)
+            email = f"budget-{uuid.uuid4().hex[:12]}@example.com"
+            password = "budget-password"
+
+            # Accounts
+            await s.step(3, "POST", "/register", json={"username": "budget", "email": email, "password": password})
+            login = await s.step(1, "POST", "/login", data={"username": email, "password": password})
+            tokens = login.json()
+            auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+            await s.step(1, "POST", "/refresh", json={"refresh_token": tokens["refresh_token"]})
+            await s.step(None, "GET", "/me", headers=auth)
+            await s.step(0, "GET", "/me", headers=auth)
+            # Load, pg_notify to the other workers' principal caches and, for a
+            # rename, their feed and search caches, update, refresh.
+            await s.step(5, "PUT", "/update-user", headers=auth, json={"username": "budget-renamed"})
+            # update-user evicts the cached principal; warm it again.
+            await s.step(None, "GET", "/me", headers=auth)
+
+            # Posts
+            # Every post/document write adds one pg_notify so the other workers drop
+            # their cached search pages and feed snapshot.
+            post = (await s.step(3, "POST", "/create-post", headers=auth,
+                                 json={"post_title": "Query budget", "post_content": "Counting round trips per route"})).json()
+            viewed = await s.step(1, "GET", f"/view-post/{post['post_id']}")
+            await s.step(1, "GET", f"/view-post/{post['post_id']}", expect=304, headers={"If-None-Match": viewed.headers["etag"]})
+            await s.step(1, "GET", "/my-posts", headers=auth)
+            # Feed: the first page is rebuilt once after the write, then served from the snapshot
+            feed = await s.step(1, "GET", "/feed", params={"limit": 1})
+            await s.step(0, "GET", "/feed", params={"limit": 1})
+            if feed.headers.get("x-next-cursor"):
+                await s.step(1, "GET", "/feed", params={"limit": 1, "cursor": feed.headers["x-next-cursor"]})
+            await s.step(4, "PUT", f"/update-post/{post['post_id']}", headers=auth, json={"post_title": "Query budget, edited"})
+
+            # Search: cold split (one query per type), totals, unified, then a cache hit
+            await s.step(2, "GET", "/search", params={"query": "budget"})
+            await s.step(4, "GET", "/search", params={"query": "budget", "include_total": True})
+            await s.step(1, "GET", "/search", params={"query": "budget", "mode": "unified"})
+            await s.step(0, "GET", "/search", params={"query": "budget", "mode": "unified"})
+
+            # Documents: uploads commit an outbox intent first and delete it with the
+            # document insert; deletes queue the S3 object in the outbox
+            document = (await s.step(5, "POST", "/upload-reading-documents", headers=auth,
+                                     data={"docs_title": "Query budget", "docs_description": "Budget fixture", "docs_tags": "Documents"},
+                                     files={"file": ("budget.pdf", PLACEHOLDER_PDF, "application/pdf")})).json()
+            downloaded = await s.step(1, "GET", f"/download-document/{document['docs_id']}")
+            await s.step(1, "GET", f"/download-document/{document['docs_id']}", expect=304, headers={"If-None-Match": downloaded.headers["etag"]})
+            await s.step(1, "POST", "/download-documents", json={"docs_ids": [document["docs_id"]]})
+            await s.step(1, "GET", "/my-reading-documents", headers=auth, params={"include_urls": True})
+            await s.step(4, "DELETE", f"/delete-reading-document/{document['docs_id']}", headers=auth)
+            await s.step(3, "DELETE", f"/delete-post/{post['post_id']}", headers=auth)
+
+            # Batch routes: one permission query and one statement however many ids are sent, plus the pg_notify for writes
+            batch_posts = [(await s.step(3, "POST", "/create-post", headers=auth,
+                                         json={"post_title": f"Batch {i}", "post_content": "Batch fixture"})).json()["post_id"]
+                           for i in range(3)]
+            batch_docs = [(await s.step(5, "POST", "/upload-reading-documents", headers=auth,
+                                        data={"docs_title": f"Batch {i}", "docs_description": "Batch fixture", "docs_tags": "Documents"},
+                                        files={"file": (f"batch-{i}.pdf", PLACEHOLDER_PDF, "application/pdf")})).json()["docs_id"]
+                          for i in range(2)]
+            await s.step(1, "POST", "/view-posts", json={"post_ids": batch_posts + [str(uuid.uuid4())]})
+            await s.step(3, "POST", "/delete-posts", headers=auth, json={"post_ids": batch_posts + [str(uuid.uuid4())]})
+            await s.step(4, "POST", "/delete-reading-documents", headers=auth, json={"docs_ids": batch_docs})
+
+            # Admin
+            if settings.ADMIN_EMAIL and settings.ADMIN_PASSWORD:
+                admin_login = await s.step(None, "POST", "/login", data={"username": settings.ADMIN_EMAIL, "password": settings.ADMIN_PASSWORD})
+                admin = {"Authorization": f"Bearer {admin_login.json()['access_token']}"}
+                await s.step(None, "GET", "/me", headers=admin)
+                await s.step(1, "GET", "/users", headers=admin, params={"limit": 10})
+                await s.step(0, "GET", "/search/cache-stats", headers=admin)
+            else:
+                print("skip  admin routes (ADMIN_EMAIL/ADMIN_PASSWORD not set)")
+
+            await s.step(1, "POST", "/logout", headers=auth)
+            await s.step(1, "GET", "/me", headers=auth, expect=401)
+
+    print(f"{s.failures} step(s) over budget" if s.failures else "all routes within budget")
+    return s.failures
+
+
+async def run(args) -> int:
+    return 1 if await measure(args.verbose) else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare per-call S3 clients with one long-lived pooled client.
+
+Start a local S3 stand-in first, for example ``moto_server -p 5000``, then:
+
+    python -m benchmarks.s3_client --endpoint-url http://localhost:5000 --uploads 200
+
+"per_call" reproduces the old behaviour: a new client and a head_bucket before
+every put_object. "pooled" reuses one client with keep-alive connections.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+
+from benchmarks.common import summarize
+
+PAYLOAD = os.urandom(256 * 1024)
+
+
+def client_kwargs(args) -> dict:
+    return {
+        "region_name": args.region,
+        "endpoint_url": args.endpoint_url,
+        "aws_access_key_id": "testing",
+        "aws_secret_access_key": "testing",
+    }
+
+
+async def per_call_upload(args, key: str) -> None:
+    async with get_session().create_client("s3", **client_kwargs(args)) as client:
+        await client.head_bucket(Bucket=args.bucket)
+        await client.put_object(Bucket=args.bucket, Key=key, Body=PAYLOAD)
+
+
+async def per_call_presign(args, key: str) -> None:
+    async with get_session().create_client("s3", **client_kwargs(args)) as client:
+        await client.generate_presigned_url("get_object", Params={"Bucket": args.bucket, "Key": key}, ExpiresIn=3600)
+
+
+async def timed(samples: list, coro) -> None:
+    start = time.perf_counter()
+    await coro
+    samples.append(time.perf_counter() - start)
+
+
+async def run_batch(args, make_coro) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    samples: list = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await timed(samples, make_coro(f"bench/{i}.pdf"))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.uploads)))
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint-url", default="http://localhost:5000")
+    parser.add_argument("--region", default="us-east-1")
+    parser.add_argument("--bucket", default="torum-bench")
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-pool-connections", type=int, default=20)
+    args = parser.parse_args()
+
+    async with get_session().create_client("s3", **client_kwargs(args)) as setup:
+        await setup.create_bucket(Bucket=args.bucket)
+
+    report = {
+        "per_call": {
+            "upload": await run_batch(args, lambda key: per_call_upload(args, key)),
+            "presign": await run_batch(args, lambda key: per_call_presign(args, key)),
+        }
+    }
+    config = AioConfig(max_pool_connections=args.max_pool_connections, connector_args={"keepalive_timeout": 30})
+    async with get_session().create_client("s3", config=config, **client_kwargs(args)) as client:
+        report["pooled"] = {
+            "upload": await run_batch(args, lambda key: client.put_object(Bucket=args.bucket, Key=key, Body=PAYLOAD)),
+            "presign": await run_batch(args, lambda key: client.generate_presigned_url(
+                "get_object", Params={"Bucket": args.bucket, "Key": key}, ExpiresIn=3600)),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""Write cost and rank quality: trigger-maintained vs weighted generated search vectors.
+
+Load the synthetic dataset with ``benchmarks.datagen`` first, then:
+
+    python -m benchmarks.search_ranking --rows 50000 --top 10
+
+The first --rows posts are copied into two temporary tables. "trigger" rebuilds
+an unweighted vector on every INSERT/UPDATE, the way the old migration did, and
+is ranked with ts_rank. "generated" is the weighted stored column, ranked with
+ts_rank_cd. Write cost covers a bulk insert, an UPDATE that touches no text
+column and an UPDATE of the title. Rank quality is title_hit@k: the share of
+the top k results whose title itself matches the query. Titles are what users
+see and scan, so this is the best proxy for relevance the synthetic data offers.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import asyncpg
+
+from backend.src.bulk import plain_dsn
+from backend.src.config import get_settings
+from benchmarks.common import percentile
+from benchmarks.datagen import TOPIC_WORDS
+
+TABLES = {
+    "trigger": """
+        CREATE TEMP TABLE bench_trigger (
+            id serial PRIMARY KEY, post_title text NOT NULL, post_content text,
+            updated_at timestamptz, search_vector tsvector
+        );
+        CREATE TRIGGER bench_trigger_tsvector BEFORE INSERT OR UPDATE ON bench_trigger FOR EACH ROW
+            EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.english', post_title, post_content);
+        CREATE INDEX ON bench_trigger USING gin (search_vector);
+    """,
+    "generated": """
+        CREATE TEMP TABLE bench_generated (
+            id serial PRIMARY KEY, post_title text NOT NULL, post_content text, updated_at timestamptz,
+            search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(post_title, '')), 'A') ||
+                setweight(to_tsvector('pg_catalog.english'::regconfig, coalesce(post_content, '')), 'B')
+            ) STORED
+        );
+        CREATE INDEX ON bench_generated USING gin (search_vector);
+    """,
+}
+
+RANK = {
+    "trigger": "ts_rank(search_vector, q)",
+    "generated": "ts_rank_cd(search_vector, q, {normalization})",
+}
+
+
+async def timed_execute(connection, statement: str, *args) -> float:
+    start = time.perf_counter()
+    await connection.execute(statement, *args)
+    return round(time.perf_counter() - start, 3)
+
+
+async def write_cost(connection, name: str, rows: int) -> dict:
+    table = f"bench_{name}"
+    await connection.execute(TABLES[name])
+    insert = await timed_execute(connection, f"""
+        INSERT INTO {table} (post_title, post_content)
+        SELECT post_title, post_content FROM posts ORDER BY post_id LIMIT $1
+    """, rows)
+    await connection.execute(f"ANALYZE {table}")
+    return {
+        "insert_s": insert,
+        "update_untouched_text_s": await timed_execute(connection, f"UPDATE {table} SET updated_at = now()"),
+        "update_title_s": await timed_execute(connection, f"UPDATE {table} SET post_title = post_title || ' '"),
+    }
+
+
+async def rank_quality(connection, name: str, terms, top: int, normalization: int) -> dict:
+    rank = RANK[name].format(normalization=normalization)
+    statement = f"""
+        SELECT coalesce(avg((to_tsvector('pg_catalog.english', post_title) @@ q)::int), 0)
+        FROM (
+            SELECT post_title, q FROM bench_{name}, to_tsquery('english', $1) q
+            WHERE search_vector @@ q
+            ORDER BY {rank} DESC LIMIT $2
+        ) top
+    """
+    hits, latencies = [], []
+    for term in terms:
+        start = time.perf_counter()
+        hits.append(float(await connection.fetchval(statement, f"{term}:*", top)))
+        latencies.append(time.perf_counter() - start)
+    return {
+        f"title_hit_at_{top}": round(sum(hits) / len(hits), 3),
+        "query_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "query_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--normalization", type=int, default=get_settings().SEARCH_RANK_NORMALIZATION)
+    args = parser.parse_args()
+
+    connection = await asyncpg.connect(plain_dsn())
+    try:
+        rows = min(args.rows, await connection.fetchval("SELECT count(*) FROM posts"))
+        if not rows:
+            raise SystemExit("posts is empty; load a dataset with benchmarks.datagen first")
+        report = {"rows": rows, "normalization": args.normalization}
+        for name in TABLES:
+            report[name] = {
+                **await write_cost(connection, name, rows),
+                **await rank_quality(connection, name, TOPIC_WORDS, args.top, args.normalization),
+            }
+    finally:
+        await connection.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
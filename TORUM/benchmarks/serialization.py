@@ -0,0 +1,122 @@
+"""Bytes per response and serialization time for list/search payloads.
+
+    python -m benchmarks.serialization --items 1,10,50,200 --content-size 5000
+
+"full_rows" mirrors what list routes used to send (every post column, the
+whole body and the search_vector text); "summaries" is the PostSummary
+projection with an excerpt. For each response size the summaries are encoded
+three ways:
+
+  jsonable_encoder  FastAPI before 0.130: jsonable_encoder, then json.dumps
+  response_model    validate into List[PostSummary], then Pydantic's dump_json,
+                    which is what FastAPI does for a route with a response_model
+  rows_orjson       the row dicts straight through orjson (router.rows_response)
+"""
+import argparse
+import json
+import random
+import string
+import time
+import uuid
+
+from datetime import datetime, timezone
+
+import orjson
+
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from backend.src.auth.schemas import PostSummary
+
+POST_SUMMARIES = TypeAdapter(List[PostSummary])
+
+WORDS = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 10))) for _ in range(2000)]
+
+
+def text_of(size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = random.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def full_row(content_size: int) -> dict:
+    content = text_of(content_size)
+    vector = " ".join(f"'{word}':{i}" for i, word in enumerate(content.split()[:400], start=1))
+    return {
+        "post_id": uuid.uuid4(),
+        "post_owner": uuid.uuid4(),
+        "post_title": text_of(60),
+        "post_content": content,
+        "created_at": datetime.now(timezone.utc),
+        "updated_at": None,
+        "search_vector": vector,
+    }
+
+
+def summary_of(row: dict, excerpt_length: int) -> dict:
+    return {
+        "post_id": row["post_id"],
+        "post_owner": row["post_owner"],
+        "post_title": row["post_title"],
+        "excerpt": row["post_content"][:excerpt_length],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def measure(payload, rounds: int, encode) -> dict:
+    body = encode(payload)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode(payload)
+    elapsed = time.perf_counter() - start
+    return {"bytes": len(body), "serialize_us": round(elapsed / rounds * 1e6, 1)}
+
+
+def encode_default(payload) -> bytes:
+    # FastAPI's path before 0.130: jsonable_encoder, then json.dumps in JSONResponse.
+    return json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+
+
+def encode_response_model(payload) -> bytes:
+    return POST_SUMMARIES.dump_json(POST_SUMMARIES.validate_python(payload), exclude_unset=True)
+
+
+def encode_rows(payload) -> bytes:
+    return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+ENCODERS = {
+    "jsonable_encoder": encode_default,
+    "response_model": encode_response_model,
+    "rows_orjson": encode_rows,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", default="1,10,50,200", help="comma-separated response sizes")
+    parser.add_argument("--content-size", type=int, default=5000)
+    parser.add_argument("--excerpt-length", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    report = {}
+    for items in (int(size) for size in args.items.split(",")):
+        rows = [full_row(args.content_size) for _ in range(items)]
+        summaries = [summary_of(row, args.excerpt_length) for row in rows]
+        report[items] = {
+            "full_rows": measure(rows, args.rounds, encode_default),
+            "summaries": {name: measure(summaries, args.rounds, encode) for name, encode in ENCODERS.items()},
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Throughput of the API at 1, 2, 4 and 8 worker processes.
+
+Starts ``python -m backend.src.server`` once per worker count (API_WORKERS is
+passed through the environment, everything else comes from .env), drives a
+fixed read workload against it and reports throughput and latency percentiles.
+The server runs with RATE_LIMIT_ENABLED=false: the whole workload comes from
+one address and would otherwise mostly measure 429s from the search bucket.
+
+    python -m benchmarks.workers --post-id <uuid> --query forum --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import summarize
+
+
+async def wait_until_ready(base_url: str, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/openapi.json")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"server at {base_url} did not become ready")
+
+
+async def drive(args, base_url: str) -> dict:
+    paths = [f"/view-post/{args.post_id}", f"/search?query={args.query}"]
+    samples: list = []
+    errors = 0
+
+    async def worker(client: httpx.AsyncClient, index: int, stop_at: float) -> None:
+        nonlocal errors
+        i = index
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            samples.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+            i += 1
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        stop_at = time.perf_counter() + args.duration
+        await asyncio.gather(*(worker(client, i, stop_at) for i in range(args.concurrency)))
+    return {**summarize(samples, args.duration), "errors": errors}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--post-id", required=True)
+    parser.add_argument("--query", default="forum")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    report = {}
+    for workers in args.workers:
+        env = {**os.environ, "API_WORKERS": str(workers), "API_PORT": str(args.port), "API_HOST": "127.0.0.1",
+               "RATE_LIMIT_ENABLED": "false"}
+        server = subprocess.Popen([sys.executable, "-m", "backend.src.server"], env=env)
+        try:
+            await wait_until_ready(base_url, timeout=60)
+            report[workers] = await drive(args, base_url)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
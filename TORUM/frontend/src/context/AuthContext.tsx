@@ -79,10 +79,13 @@ export function AuthProvider({ children }: { children: ReactNode }) {
             if (!response.ok) {
                 throw new Error('Failed to refresh token');
             }
-            const data: { access_token: string; token_type: string } = await response.json();
+            const data: { access_token: string; refresh_token: string; token_type: string } = await response.json();
             setAccessToken(data.access_token);
+            // Refresh tokens are single-use: keep the rotated one.
+            setRefreshToken(data.refresh_token);
             setError(null);
             localStorage.setItem('access_token', data.access_token);
+            localStorage.setItem('refresh_token', data.refresh_token);
         } catch (err) {
             setError('Session expired. Please log in again.');
             await logout();
@@ -1,4 +1,16 @@
+import React, { useEffect, useState } from "react";
+import { Link } from "react-router-dom";
+
+import { getFeed } from "../services/api";
+import { type FeedEntry } from "../types";
+
 const Home: React.FC = () => {
+    const [feed, setFeed] = useState<FeedEntry[]>([]);
+
+    useEffect(() => {
+        getFeed().then(setFeed).catch(() => setFeed([]));
+    }, []);
+
     return (
     <div className="flex flex-col items-center justify-center min-h-[calc(100vh-4rem)] bg-gradient-to-b from-blue-50 to-white p-4">
         <div className="max-w-3xl text-center">
@@ -23,6 +35,22 @@ const Home: React.FC = () => {
                 <p className="text-sm text-gray-600">Follow the latest trading signals and system updates.</p>
             </div>
         </div>
+        {feed.length > 0 && (
+            <div className="mt-10 w-full max-w-4xl">
+                <h2 className="mb-4 text-2xl font-bold text-blue-800">Recent Posts</h2>
+                {feed.map((post) => (
+                    <div key={post.post_id} className="mb-4 p-4 bg-white rounded-lg shadow hover:bg-gray-50">
+                        <Link to={`/view-post/${post.post_id}`} className="text-xl font-semibold text-blue-600 hover:underline">
+                            {post.post_title}
+                        </Link>
+                        <p className="text-sm text-gray-500">
+                            {post.author_username} ({post.author_role}) · {new Date(post.created_at).toLocaleString()}
+                        </p>
+                        {post.excerpt && <p className="mt-2 text-gray-700">{post.excerpt}</p>}
+                    </div>
+                ))}
+            </div>
+        )}
     </div>
   );
 };
@@ -2,7 +2,7 @@ import axios from "axios";
 
 import type { User, UserUpdate, 
               AuthResponse, LoginCredentials, SignupCredentials, 
-              Post, PostCreate, PostUpdate, 
+              Post, PostCreate, PostUpdate, FeedEntry, 
               ReadingDocumentResponse, 
               Search
             } from "../types/index";
@@ -26,6 +26,7 @@ api.interceptors.request.use(async (config) => {
               const response = await axios.post(`${import.meta.env.VITE_API_BASE_URL}/refresh`, { refresh_token: refreshToken }, { headers: { 'Content-Type': 'application/json' } });
               token = response.data.access_token;
               localStorage.setItem('access_token', response.data.access_token);
+              localStorage.setItem('refresh_token', response.data.refresh_token);
             } else {
               throw new Error('No refresh token available');
             }
@@ -41,6 +42,19 @@ api.interceptors.request.use(async (config) => {
     return config;
 });
 
+// List routes return one page at a time; the cursor for the next page comes
+// back in the X-Next-Cursor header and is absent on the last page.
+const getAllPages = async <T>(url: string, params: Record<string, unknown> = {}): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get<T[]>(url, { params: { ...params, cursor } });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return items;
+};
+
 export const login = async (credentials: LoginCredentials) => {
     const formData = new URLSearchParams();
     formData.append('username', credentials.email);
@@ -64,7 +78,11 @@ export const createPost = async (post: PostCreate): Promise<Post> => {
 };
 
 export const getMyPosts = async(): Promise<Post[]> => {
-  const response = await api.get('/my-posts');
+  return getAllPages<Post>('/my-posts');
+}
+
+export const getFeed = async(limit: number = 20): Promise<FeedEntry[]> => {
+  const response = await api.get('/feed', { params: { limit } });
   return response.data;
 }
 
@@ -115,8 +133,7 @@ export const uploadReadingDocument = async (title: string, description: string,
 }
 
 export const getMyDocuments = async (): Promise<ReadingDocumentResponse[]> => {
-  const response = await api.get('/my-reading-documents');
-  return response.data;
+  return getAllPages<ReadingDocumentResponse>('/my-reading-documents');
 }
 
 export const downloadDocument = async (docId: string): Promise<{ url: string }> => {
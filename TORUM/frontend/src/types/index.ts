@@ -43,6 +43,17 @@ export interface Post {
     updated_at: string | null;
 };
 
+export interface FeedEntry {
+    post_id: string;
+    post_owner: string;
+    post_title: string;
+    excerpt: string | null;
+    created_at: string;
+    updated_at: string | null;
+    author_username: string;
+    author_role: string;
+};
+
 export interface PostCreate {
     post_title: string;
     post_content: string;
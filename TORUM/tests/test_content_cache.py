@@ -0,0 +1,78 @@
+"""Cached search pages and the feed snapshot follow writes made in other processes.
+
+The feed snapshot is built through a session factory that counts the queries it
+is asked to run, so no database is needed.
+"""
+import asyncio
+
+import pytest
+
+from backend.src.notify import _dispatch
+from backend.src.auth import search
+from backend.src.auth.feed import FeedSnapshot
+
+
+class CountingResult:
+    def mappings(self):
+        return []
+
+
+class CountingSessionFactory:
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, *args, **kwargs):
+        self.queries += 1
+        return CountingResult()
+
+
+@pytest.fixture
+def sessions():
+    return CountingSessionFactory()
+
+
+def rebuilds(snapshot, sessions, requests: int = 3) -> int:
+    before = sessions.queries
+
+    async def read():
+        for _ in range(requests):
+            await snapshot.rows()
+
+    asyncio.run(read())
+    return sessions.queries - before
+
+
+def test_notification_from_another_process_bumps_the_generation():
+    generation = search.content_generation()
+    # What the shared listener does when an API worker or the extraction worker commits a write.
+    _dispatch(None, 0, search.CONTENT_CHANNEL, "")
+    assert search.content_generation() == generation + 1
+
+
+def test_feed_snapshot_is_rebuilt_after_a_broadcast_write(sessions):
+    snapshot = FeedSnapshot(ttl_seconds=60, session_factory=sessions)
+    assert rebuilds(snapshot, sessions) == 1
+    _dispatch(None, 0, search.CONTENT_CHANNEL, "")
+    assert rebuilds(snapshot, sessions) == 1
+
+
+def test_multi_worker_without_listener_skips_the_content_caches(sessions, monkeypatch):
+    monkeypatch.setattr(search, "API_WORKERS", 4)
+    # Writes on the other workers would go unnoticed, so nothing is reused.
+    assert not search.content_cache_enabled()
+    snapshot = FeedSnapshot(ttl_seconds=60, session_factory=sessions)
+    assert rebuilds(snapshot, sessions) == 3
+
+
+def test_standalone_extraction_without_listener_skips_the_content_caches(monkeypatch):
+    monkeypatch.setattr(search, "EXTRACTION_IN_PROCESS", False)
+    assert not search.content_cache_enabled()
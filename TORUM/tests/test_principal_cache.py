@@ -0,0 +1,110 @@
+"""Authenticated requests resolve the principal without querying users.
+
+Runs the real /me route with get_db overridden by a session that counts the
+statements it is asked to run, so no database is needed.
+"""
+import uuid
+
+from types import SimpleNamespace
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from backend.src.database import get_db
+from backend.src.main import app
+from backend.src.notify import _dispatch
+from backend.src.auth import dependencies
+from backend.src.auth.services import create_access_token, token_claims
+
+
+class CountingResult:
+    def __init__(self, user):
+        self.user = user
+
+    def scalar_one_or_none(self):
+        return self.user
+
+
+class CountingSession:
+    def __init__(self, user):
+        self.user = user
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(str(statement))
+        return CountingResult(self.user)
+
+
+@pytest.fixture
+def user():
+    return SimpleNamespace(user_id=uuid.uuid4(), username="cached", email="cached@example.com", user_role="admin")
+
+
+@pytest.fixture
+def session(user):
+    session = CountingSession(user)
+
+    async def counting_db():
+        yield session
+
+    dependencies.clear_principals()
+    app.dependency_overrides[get_db] = counting_db
+    yield session
+    app.dependency_overrides.pop(get_db, None)
+    dependencies.clear_principals()
+
+
+@pytest.fixture
+def client():
+    # Not entered as a context manager, so the lifespan (pools, S3, workers) doesn't run.
+    return TestClient(app)
+
+
+def queries_for(client, session, headers) -> int:
+    before = len(session.statements)
+    response = client.get("/me", headers=headers)
+    assert response.status_code == 200
+    return len(session.statements) - before
+
+
+def test_warm_principal_costs_no_queries(client, session, user):
+    headers = {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+    assert queries_for(client, session, headers) == 1
+    for _ in range(5):
+        assert queries_for(client, session, headers) == 0
+
+
+def test_local_invalidation_reloads_principal(client, session, user):
+    headers = {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+    queries_for(client, session, headers)
+    user.user_role = "user"
+    dependencies.invalidate_principal(user.user_id)
+    assert queries_for(client, session, headers) == 1
+    assert client.get("/me", headers=headers).json()["user_role"] == "user"
+
+
+def test_notification_from_another_worker_reloads_principal(client, session, user):
+    headers = {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+    queries_for(client, session, headers)
+    user.user_role = "user"
+    # What the shared listener does when another worker commits a role change.
+    _dispatch(None, 0, dependencies.PRINCIPAL_CHANNEL, str(user.user_id))
+    assert queries_for(client, session, headers) == 1
+    assert client.get("/me", headers=headers).json()["user_role"] == "user"
+
+
+def test_listener_reconnect_clears_every_principal(client, session, user):
+    headers = {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+    queries_for(client, session, headers)
+    dependencies.clear_principals()
+    assert queries_for(client, session, headers) == 1
+
+
+def test_multi_worker_without_listener_skips_the_cache(client, session, user, monkeypatch):
+    monkeypatch.setattr(dependencies, "API_WORKERS", 4)
+    headers = {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+    # Nothing would tell this worker about changes made on the others.
+    assert not dependencies.principal_cache_enabled()
+    assert queries_for(client, session, headers) == 1
+    assert queries_for(client, session, headers) == 1
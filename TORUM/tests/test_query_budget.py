@@ -0,0 +1,45 @@
+"""The per-route SQL budgets from benchmarks.query_budget as a test.
+
+Needs the migrated Postgres and the S3 stand-in from .env, like the benchmark
+itself; without them the test is skipped rather than failed.
+"""
+import asyncio
+import socket
+
+from urllib.parse import urlsplit
+
+import asyncpg
+import pytest
+
+from backend.src.config import get_settings
+from backend.src.database import SQLALCHEMY_DATABASE_URL
+from benchmarks.query_budget import measure
+
+
+async def database_reachable() -> bool:
+    try:
+        connection = await asyncpg.connect(SQLALCHEMY_DATABASE_URL.replace("+asyncpg", ""), timeout=2)
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError):
+        return False
+    await connection.close()
+    return True
+
+
+def s3_reachable() -> bool:
+    endpoint = get_settings().S3_ENDPOINT_URL
+    if not endpoint:
+        return True
+    url = urlsplit(endpoint)
+    try:
+        socket.create_connection((url.hostname, url.port or (443 if url.scheme == "https" else 80)), timeout=2).close()
+    except OSError:
+        return False
+    return True
+
+
+def test_every_route_within_its_query_budget():
+    if not asyncio.run(database_reachable()):
+        pytest.skip("Postgres is not reachable")
+    if not s3_reachable():
+        pytest.skip("S3 endpoint is not reachable")
+    assert asyncio.run(measure()) == 0, "steps over budget; rerun with -s to see their statements"
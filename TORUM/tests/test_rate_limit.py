@@ -0,0 +1,144 @@
+"""Token buckets, the shared rate limit backend, and admission control.
+
+A FakeSharedBackend keeps its buckets in a plain dict that several backend
+instances can share, standing in for the rate_limit_buckets table that every
+worker reaches; no database is needed.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from backend.src.admission import AdmissionMiddleware
+from backend.src.auth import ratelimit
+from backend.src.auth.ratelimit import MemoryRateLimitBackend, PostgresRateLimitBackend, RateLimitBackend, RateLimitPolicy, rate_limit, set_rate_limit_backend
+
+POLICY = RateLimitPolicy("test", 3, 60)
+
+
+class FakeSharedBackend(RateLimitBackend):
+    """No refill: the tests finish long before a token would come back."""
+
+    def __init__(self, store: dict):
+        self.store = store
+
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> float:
+        tokens = self.store.get(key, policy.burst)
+        if tokens >= 1:
+            self.store[key] = tokens - 1
+            return 0.0
+        return 1 / policy.rate
+
+
+class FailingSession:
+    async def __aenter__(self):
+        raise ConnectionRefusedError("database is down")
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def test_policy(monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setitem(ratelimit.POLICIES, POLICY.name, POLICY)
+    yield
+    set_rate_limit_backend(None)
+
+
+def limited_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(rate_limit(POLICY.name))])
+    async def limited():
+        return {"ok": True}
+
+    return app
+
+
+def test_token_bucket_allows_a_burst_then_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    backend = MemoryRateLimitBackend()
+    acquire = lambda: asyncio.run(backend.acquire("test:ip:1", POLICY))
+    assert [acquire() for _ in range(POLICY.burst)] == [0.0] * POLICY.burst
+    assert acquire() == pytest.approx(1 / POLICY.rate)
+    now[0] += 1 / POLICY.rate
+    assert acquire() == 0.0
+    assert acquire() > 0
+
+
+def test_two_app_instances_share_one_budget():
+    store = {}
+    workers = [(TestClient(limited_app()), FakeSharedBackend(store)) for _ in range(2)]
+    statuses = []
+    for i in range(POLICY.burst + 1):
+        client, backend = workers[i % 2]
+        set_rate_limit_backend(backend)
+        statuses.append(client.get("/limited").status_code)
+    assert statuses == [200] * POLICY.burst + [429]
+
+
+def test_rate_limited_response_has_retry_after():
+    set_rate_limit_backend(FakeSharedBackend({}))
+    client = TestClient(limited_app())
+    for _ in range(POLICY.burst):
+        client.get("/limited")
+    response = client.get("/limited")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == 20
+
+
+def test_unreachable_shared_backend_fails_open():
+    set_rate_limit_backend(PostgresRateLimitBackend(session_factory=FailingSession))
+    client = TestClient(limited_app())
+    assert [client.get("/limited").status_code for _ in range(POLICY.burst + 2)] == [200] * (POLICY.burst + 2)
+
+
+def blocking_app(release: asyncio.Event):
+    """An ASGI app whose requests hold their admission slot until release is set."""
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    return app
+
+
+def test_admission_sheds_with_retry_after_when_the_queue_is_full():
+    async def scenario():
+        release = asyncio.Event()
+        admission = AdmissionMiddleware(blocking_app(release), max_in_flight=1, max_queued=1, queue_timeout=30, retry_after=7)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=admission), base_url="http://admission") as client:
+            running = asyncio.create_task(client.get("/slow"))
+            queued = asyncio.create_task(client.get("/slow"))
+            while admission._waiting < 1:
+                await asyncio.sleep(0)
+            shed = await client.get("/slow")
+            release.set()
+            return shed, await running, await queued
+
+    shed, running, queued = asyncio.run(scenario())
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "7"
+    assert running.status_code == 200
+    assert queued.status_code == 200
+
+
+def test_admission_sheds_requests_that_wait_too_long():
+    async def scenario():
+        release = asyncio.Event()
+        admission = AdmissionMiddleware(blocking_app(release), max_in_flight=1, max_queued=5, queue_timeout=0.05, retry_after=1)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=admission), base_url="http://admission") as client:
+            running = asyncio.create_task(client.get("/slow"))
+            while not admission._slots.locked():
+                await asyncio.sleep(0)
+            timed_out = await client.get("/slow")
+            release.set()
+            return timed_out, await running
+
+    timed_out, running = asyncio.run(scenario())
+    assert timed_out.status_code == 503
+    assert running.status_code == 200
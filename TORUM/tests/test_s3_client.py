@@ -0,0 +1,52 @@
+"""While S3 is down, get_s3_client answers 503 and backs off between attempts."""
+import asyncio
+
+import pytest
+
+from botocore.exceptions import EndpointConnectionError
+
+from backend.src.auth import utils
+from backend.src.auth.exceptions import StorageUnavailable
+
+
+@pytest.fixture
+def failing_s3(monkeypatch):
+    attempts = []
+
+    async def open_s3_client():
+        attempts.append(1)
+        raise EndpointConnectionError(endpoint_url="http://s3.invalid")
+
+    monkeypatch.setattr(utils, "_open_s3_client", open_s3_client)
+    monkeypatch.setattr(utils, "_s3_client", None)
+    monkeypatch.setattr(utils, "_s3_failures", 0)
+    monkeypatch.setattr(utils, "_s3_retry_at", 0.0)
+    return attempts
+
+
+def get_client():
+    return asyncio.run(utils.get_s3_client())
+
+
+def test_failed_start_is_a_503_with_retry_after(failing_s3):
+    with pytest.raises(StorageUnavailable) as raised:
+        get_client()
+    assert raised.value.status_code == 503
+    assert int(raised.value.headers["Retry-After"]) >= 1
+
+
+def test_callers_back_off_instead_of_retrying_every_request(failing_s3):
+    for _ in range(5):
+        with pytest.raises(StorageUnavailable):
+            get_client()
+    assert len(failing_s3) == 1
+
+
+def test_backoff_grows_with_each_failure(failing_s3, monkeypatch):
+    with pytest.raises(StorageUnavailable) as first:
+        get_client()
+    monkeypatch.setattr(utils, "_s3_retry_at", 0.0)
+    with pytest.raises(StorageUnavailable) as second:
+        get_client()
+    assert len(failing_s3) == 2
+    assert int(second.value.headers["Retry-After"]) > int(first.value.headers["Retry-After"])